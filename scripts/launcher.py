@@ -3,6 +3,10 @@ import sys
 import subprocess
 import logging
 import platform
+import glob
+import hashlib
+import json
+import re
 
 def get_base_dir():
     """Get the correct base directory whether running as script or exe"""
@@ -47,6 +51,94 @@ def ensure_virtual_env(venv_dir):
             return False
     return True
 
+def get_venv_python(venv_dir):
+    """Path of the interpreter inside the virtual environment"""
+    if sys.platform == "win32":
+        return os.path.join(venv_dir, "Scripts", "python.exe")
+    return os.path.join(venv_dir, "bin", "python")
+
+def normalize_dist_name(name):
+    """PEP 503 normalisation so 'unidic-lite' matches 'unidic_lite'"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def read_requirements(requirements_path):
+    """Return {normalised name: requirement line} from requirements.txt"""
+    requirements = {}
+    if not os.path.exists(requirements_path):
+        return requirements
+    with open(requirements_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line or line.startswith('-'):
+                continue
+            match = re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", line)
+            if match:
+                requirements[normalize_dist_name(match.group(0))] = line
+    return requirements
+
+def list_installed_distributions(venv_dir):
+    """Names and versions from the venv's *.dist-info folders, read without starting Python"""
+    patterns = [
+        os.path.join(venv_dir, "Lib", "site-packages", "*.dist-info"),
+        os.path.join(venv_dir, "lib", "python*", "site-packages", "*.dist-info"),
+    ]
+    installed = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            name_version = os.path.basename(path)[:-len(".dist-info")]
+            name, _, version = name_version.partition("-")
+            installed[normalize_dist_name(name)] = version
+    return installed
+
+def compute_env_fingerprint(venv_dir, requirements_path):
+    """Hash the interpreter, installed distributions and requirements.txt"""
+    python_path = get_venv_python(venv_dir)
+    pyvenv_cfg = ""
+    if os.path.exists(os.path.join(venv_dir, "pyvenv.cfg")):
+        with open(os.path.join(venv_dir, "pyvenv.cfg"), 'r') as f:
+            pyvenv_cfg = f.read()
+    requirements_hash = ""
+    if os.path.exists(requirements_path):
+        with open(requirements_path, 'rb') as f:
+            requirements_hash = hashlib.sha256(f.read()).hexdigest()
+    state = {
+        "python": python_path,
+        "python_mtime": os.path.getmtime(python_path) if os.path.exists(python_path) else 0,
+        "pyvenv_cfg": pyvenv_cfg,
+        "distributions": sorted(list_installed_distributions(venv_dir).items()),
+        "requirements": requirements_hash,
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
+
+def ensure_dependencies(venv_dir, requirements_path):
+    """Fast path when the venv fingerprint matches; otherwise install only what is missing"""
+    fingerprint_file = os.path.join(venv_dir, ".friskocr_env.json")
+    fingerprint = compute_env_fingerprint(venv_dir, requirements_path)
+    try:
+        with open(fingerprint_file, 'r') as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                logging.info("Environment fingerprint matches, skipping dependency checks")
+                return True
+    except (OSError, ValueError):
+        pass
+
+    installed = list_installed_distributions(venv_dir)
+    missing = [line for name, line in read_requirements(requirements_path).items() if name not in installed]
+    if missing:
+        logging.info(f"Installing missing packages: {', '.join(missing)}")
+        try:
+            subprocess.run([get_venv_python(venv_dir), "-m", "pip", "install"] + missing, check=True)
+        except (subprocess.CalledProcessError, OSError) as e:
+            logging.error(f"Failed to install missing packages: {e}")
+            return False
+        fingerprint = compute_env_fingerprint(venv_dir, requirements_path)
+    else:
+        logging.info("All requirements present, recording environment fingerprint")
+
+    with open(fingerprint_file, 'w') as f:
+        json.dump({"fingerprint": fingerprint}, f)
+    return True
+
 def run_main():
     try:
         # Get the actual directory where the exe/script is located
@@ -77,6 +169,12 @@ def run_main():
             logging.error(message)
             return False
         
+        if not ensure_dependencies(venv_dir, os.path.join(base_dir, "requirements.txt")):
+            message = "Failed to install missing dependencies. See logs/friskocr_launcher.log."
+            print(message)
+            logging.error(message)
+            return False
+
         if sys.platform == "win32":
             python_path = os.path.join(venv_dir, "Scripts", "python.exe")
             activate_script = os.path.join(venv_dir, "Scripts", "activate.bat")
@@ -1,5 +1,5 @@
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageSequence
 import threading
 import keyboard
 import pyperclip
@@ -8,13 +8,29 @@ import os
 import sys
 import subprocess
 import importlib.util
-from PyQt5.QtCore import Qt, QRect, QSize, QTimer, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve, QPointF, pyqtProperty
+import gc
+import time
+import queue
+import socket
+import io
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime
+from collections import defaultdict, deque
+from PyQt5.QtCore import QObject, QEventLoop, Qt, QRect, QSize, QTimer, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve, QPointF, pyqtProperty
 from PyQt5.QtGui import QCursor, QPixmap, QIcon, QPalette, QColor, QKeySequence
 from PyQt5.QtWidgets import (QApplication, QLabel, QSystemTrayIcon, QMenu, 
                            QRubberBand, QMainWindow, QDialog, QPushButton, 
                            QVBoxLayout, QHBoxLayout, QComboBox, QProgressBar,
                            QMessageBox, QLineEdit, QWidget, QGraphicsOpacityEffect)
 import multiprocessing
+import argparse
+import re
+import zipfile
+import hashlib
+import csv
+import copy
+import difflib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 def format_shortcut_display(shortcut):
     """Convert shortcut string to camel notation (e.g., 'shift+r' to 'Shift+R')"""
@@ -27,35 +43,1932 @@ def format_shortcut_display(shortcut):
             formatted_parts.append(part.upper())
     return '+'.join(formatted_parts)
 
+# Optional sections of ocr_config.json, merged over whatever the user has set
+DEFAULT_SETTINGS = {
+    "tiling": {
+        "enabled": True,
+        "max_aspect": 3.0,      # Split crops longer than this ratio along their long side
+        "overlap": 0.2,         # Fraction of each tile shared with its neighbour
+        "wide_order": "rtl",    # Reading order of vertical text columns ("ltr" for left-to-right layouts)
+        "batch_size": 8,
+    },
+    "memory": {
+        "budget_mb": 0,             # 0 disables enforcement
+        "check_interval_ms": 30000,
+        "shed_engine": False,       # Allow unloading the OCR model as a last resort
+    },
+    "idle": {
+        "unload_after_min": 0,      # Unload the model after this many idle minutes, 0 keeps it loaded
+    },
+    "speculative": {
+        "enabled": False,           # Start OCR while the selection is still being dragged
+        "dwell_ms": 250,            # How long the rubber band must stay still first
+        "min_size": 8,              # Ignore selections smaller than this many pixels per side
+    },
+    "output": {
+        "sinks": ["clipboard"],     # Any of "clipboard", "pyperclip", "file", "stdout", "socket"
+        "file": "Output/ocr_results.txt",
+        "socket": "127.0.0.1:8765", # host:port, or a filesystem path for a Unix socket
+        "queue_size": 64,
+    },
+    "service": {
+        "enabled": False,           # Serve OCR to local tools over HTTP
+        "host": "127.0.0.1",
+        "port": 8766,
+        "batch_window_ms": 20,      # Requests arriving within this window share one forward pass
+        "max_batch": 8,
+    },
+    "routing": {
+        "confidence_threshold": 0.5,  # Escalate to manga-ocr below this mean EasyOCR confidence
+        "vertical_aspect": 1.5,       # Tall crops beyond this ratio without horizontal lines count as one vertical column
+        "preload_heavy": True,        # Load manga-ocr up front instead of on first escalation
+        "script_check": True,         # Send lines of square, full-height (CJK-like) glyphs straight to manga-ocr
+    },
+    "easyocr": {
+        "fast_single_line": True,   # Skip the CRAFT detector for tight single-line crops
+        "batch_size": 1,
+        "canvas_size": 2560,
+        "workers": 0,
+    },
+    "watchdog": {
+        "enabled": False,           # Run inference in a worker process that is killed when it hangs
+        "timeout_s": 30,
+        "load_timeout_s": 300,      # Deadline for a worker to load its model
+        "max_load_retries": 2,      # Respawns after a failed or overdue load before giving up
+    },
+    "torch_optimize": {
+        "enabled": False,           # Optimise the manga-ocr vision encoder after loading
+        "mode": "compile",          # "compile" (torch.compile) or "trace" (TorchScript)
+        "channels_last": True,
+        "cache_dir": "model_storage/compiled",
+        "tolerance": 1e-2,          # Max encoder output difference accepted against eager
+        "sample": "",               # Text crop for the correctness check; defaults to manga-ocr's example image
+    },
+    "decoding": {
+        "adaptive": False,          # Bound manga-ocr's output length by the text the crop can hold
+        "min_tokens": 16,
+        "max_tokens": 300,
+        "margin": 1.5,              # Headroom over the estimated character count
+        "num_beams": 1,             # 1 is greedy decoding
+        "early_stopping": True,     # Beam search only: stop once every beam has finished
+    },
+    "pipeline": {
+        "decode_threads": 2,        # File read + image decode workers feeding inference
+        "queue_size": 4,            # Items buffered between stages before upstream blocks
+    },
+    "large_images": {
+        "enabled": True,
+        "min_pixels": 40000000,     # Pages at least this big are read lazily (about 6300x6300)
+        "max_pixels": 400000000,    # Raises PIL's decompression-bomb limit up to this size
+        "detect_max_side": 2048,    # Long side of the reduced view used to find text
+        "merge_gap": 48,            # Full-resolution pixels; closer ink blocks form one region
+        "padding": 24,              # Full-resolution pixels added around each region
+        "order": "rtl",             # Reading order of regions on the page
+    },
+    "recorder": {
+        "enabled": False,           # Save every selection crop with its result for later replay
+        "dir": "recordings",
+    },
+    "profiler": {
+        "interval_ms": 5,           # Time between stack samples while profiling
+        "format": "speedscope",     # "speedscope" (JSON) or "collapsed" (flamegraph.pl input)
+    },
+    "hotkey": {
+        "backend": "auto",          # "keyboard", "x11", or "auto" (X11 key grab when available)
+    },
+    "models": {
+        "mirror_dir": "",           # Local/network directory with one sub-directory per model
+        "storage_dir": "model_storage",
+        "copy_workers": 4,
+    },
+}
+
+def read_config(config_file=None):
+    """Load ocr_config.json for headless use, without creating or rewriting it"""
+    config_file = config_file or os.path.join(get_app_dir(), "ocr_config.json")
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"shortcut": "shift+r", "model": "manga-ocr"}
+
+def get_setting_section(config, name):
+    """Return a config section merged over its defaults"""
+    section = dict(DEFAULT_SETTINGS.get(name, {}))
+    section.update(config.get(name) or {})
+    return section
+
+def manga_ocr_preprocess(mocr, pil_image):
+    """Turn a PIL image into the pixel tensor MangaOcr feeds its encoder"""
+    img = pil_image.convert('L').convert('RGB')
+    if hasattr(mocr, '_preprocess'):
+        return mocr._preprocess(img)
+    # Older manga-ocr releases call it feature_extractor and have no helper
+    return mocr.feature_extractor(img, return_tensors="pt").pixel_values.squeeze()
+
+# Per-thread cancellation check for manga-ocr decoding; set by speculative jobs
+_decode_cancel = threading.local()
+
+def decode_cancelled():
+    check = getattr(_decode_cancel, "check", None)
+    return bool(check and check())
+
+def make_cancel_criteria():
+    """StoppingCriteria ending generate() at the next token once the thread's job is cancelled.
+
+    transformers 4.39 moved stopping criteria to one bool per batch row;
+    older releases expect a plain bool and fail on a row tensor.
+    """
+    import torch
+    import transformers
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    per_row = tuple(int(part) for part in re.findall(r"\d+", transformers.__version__)[:2]) >= (4, 39)
+
+    class Cancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            if not per_row:
+                return bool(decode_cancelled())
+            return torch.full((input_ids.shape[0],), decode_cancelled(), dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([Cancelled()])
+
+def manga_ocr_batch(mocr, images, max_length=300, **generate_kwargs):
+    """Recognise several images with a single generate() call"""
+    import torch
+    from manga_ocr.ocr import post_process
+
+    if not images:
+        return []
+    if decode_cancelled():
+        return [""] * len(images)
+    if getattr(_decode_cancel, "check", None):
+        generate_kwargs.setdefault("stopping_criteria", make_cancel_criteria())
+    pixel_values = torch.stack([manga_ocr_preprocess(mocr, img) for img in images])
+    start = time.perf_counter()
+    with torch.inference_mode():
+        output = mocr.model.generate(
+            pixel_values.to(mocr.model.device), max_length=max_length, **generate_kwargs
+        ).cpu()
+    METRICS.record("manga-ocr decode", (time.perf_counter() - start) * 1000)
+
+    special_ids = set(mocr.tokenizer.all_special_ids)
+    for ids in output.tolist():
+        tokens = sum(1 for token in ids if token not in special_ids)
+        METRICS.increment("manga-ocr crops")
+        METRICS.increment("manga-ocr tokens", tokens)
+        if len(ids) >= max_length and ids[-1] not in special_ids:
+            METRICS.increment("manga-ocr decode limit hits")
+    return [post_process(mocr.tokenizer.decode(ids, skip_special_tokens=True)) for ids in output]
+
+def estimate_decode_length(pil_image, decoding):
+    """Upper bound on the tokens a crop can need, from its ink bands.
+
+    Manga text runs in vertical columns (horizontal lines for wide crops);
+    each band of ink is one column or line, the typical band thickness
+    approximates the glyph size, so the long side over that gives
+    characters per band.
+    A border margin is ignored so bubble outlines don't join the columns.
+    A lone band filling the crop is a tight single column or line; when
+    several bands are present but one still spans most of the crop the
+    profile couldn't separate them (screentone, packed columns) and the
+    estimate falls back to max_tokens rather than truncating.
+    """
+    max_tokens = int(decoding["max_tokens"])
+    ink = ink_mask(pil_image)
+    height, width = ink.shape
+    margin_y, margin_x = max(2, height // 16), max(2, width // 16)
+    if height > 4 * margin_y and width > 4 * margin_x:
+        ink = ink[margin_y:height - margin_y, margin_x:width - margin_x]
+        height, width = ink.shape
+    vertical = height >= width
+    bands = profile_bands(ink, axis=0 if vertical else 1)
+    length, across = (height, width) if vertical else (width, height)
+    if not bands or (len(bands) > 1 and max(end - start for start, end in bands) > across * 0.6):
+        return max_tokens  # No readable column structure
+    # The median band is a text column; outline fragments would skew a per-band size
+    glyph = max(4, sorted(end - start for start, end in bands)[len(bands) // 2])
+    chars = len(bands) * length / glyph
+    estimate = int(chars * float(decoding["margin"])) + 4  # Room for special tokens and punctuation
+    return max(int(decoding["min_tokens"]), min(max_tokens, estimate))
+
+def manga_decoding_kwargs(images, config):
+    """generate() arguments for a batch: adaptive max_length plus the configured search"""
+    decoding = get_setting_section(config, "decoding")
+    if decoding["adaptive"]:
+        max_length = max(estimate_decode_length(img, decoding) for img in images)
+    else:
+        max_length = int(decoding["max_tokens"])
+    kwargs = {"max_length": max_length, "num_beams": int(decoding["num_beams"])}
+    if kwargs["num_beams"] > 1:
+        kwargs["early_stopping"] = bool(decoding["early_stopping"])
+    return kwargs
+
+def split_into_tiles(pil_image, max_aspect=3.0, overlap=0.2, wide_order="rtl"):
+    """Cut a long crop into overlapping tiles along its reading direction.
+
+    Tall crops are tiled top-to-bottom, wide crops right-to-left like a
+    strip of manga columns (left-to-right when wide_order is "ltr").
+    Crops within max_aspect are returned as a single tile.
+    """
+    width, height = pil_image.size
+    tall = height >= width
+    short_side, long_side = (width, height) if tall else (height, width)
+    if short_side == 0 or long_side / short_side <= max_aspect:
+        return [pil_image]
+
+    tile_len = max(1, int(short_side * max_aspect))
+    step = max(1, int(tile_len * (1 - overlap)))
+    starts = list(range(0, long_side - tile_len, step))
+    starts.append(long_side - tile_len)  # Last tile flush with the far edge
+
+    tiles = []
+    for start in starts:
+        if tall:
+            box = (0, start, width, start + tile_len)
+        else:
+            box = (start, 0, start + tile_len, height)
+        tiles.append(pil_image.crop(box))
+    if not tall and wide_order == "rtl":
+        tiles.reverse()
+    return tiles
+
+def looks_like_vertical_columns(pil_image):
+    """True when a crop holds several vertical text columns side by side.
+
+    Columns show up as ink bands across the width that each run much
+    further down than they are wide; the glyphs of a horizontal line are
+    about as tall as they are wide.
+    """
+    import numpy as np
+
+    ink = ink_mask(pil_image)
+    bands = profile_bands(ink, axis=0)
+    if len(bands) < 2:
+        return False
+    ratios = []
+    for start, end in bands:
+        rows = np.flatnonzero(ink[:, start:end].any(axis=1))
+        ratios.append((rows[-1] - rows[0] + 1) / (end - start) if len(rows) else 0)
+    return sorted(ratios)[len(ratios) // 2] >= 2
+
+def looks_like_horizontal_lines(pil_image):
+    """True when a crop's ink forms horizontal lines of text.
+
+    The mirror of looks_like_vertical_columns: each band of ink down the
+    crop runs much further across than it is tall. A single vertical
+    column breaks into roughly square glyph bands instead.
+    """
+    import numpy as np
+
+    ink = ink_mask(pil_image)
+    bands = profile_bands(ink, axis=1)
+    if not bands:
+        return False
+    ratios = []
+    for start, end in bands:
+        cols = np.flatnonzero(ink[start:end].any(axis=0))
+        ratios.append((cols[-1] - cols[0] + 1) / (end - start) if len(cols) else 0)
+    return sorted(ratios)[len(ratios) // 2] >= 2
+
+def split_into_columns(pil_image, wide_order="rtl"):
+    """Full-height crops of each vertical text column, in reading order.
+
+    Gaps narrower than a quarter of the typical column are treated as
+    spacing inside a column (split radicals, ruby) rather than between
+    columns. Returns [] unless at least two columns are found.
+    """
+    width, height = pil_image.size
+    bands = profile_bands(ink_mask(pil_image), axis=0)
+    if len(bands) < 2:
+        return []
+    gap = max(1, sorted(end - start for start, end in bands)[len(bands) // 2] // 4)
+    bands = merge_bands(bands, gap)
+    if len(bands) < 2:
+        return []
+    columns = [pil_image.crop((max(0, start - gap), 0, min(width, end + gap), height)) for start, end in bands]
+    if wide_order == "rtl":
+        columns.reverse()
+    return columns
+
+def classify_script(pil_image):
+    """Guess 'cjk' or 'latin' for a single horizontal line from its stroke density.
+
+    A vertical scan through a CJK glyph crosses several horizontal strokes
+    (three to six is common), one through a Latin letter rarely more than
+    two or three. Returns 'unknown' for anything that isn't one clear line.
+    """
+    import numpy as np
+
+    ink = ink_mask(pil_image)
+    lines = profile_bands(ink, axis=1)
+    if len(lines) != 1 or lines[0][1] - lines[0][0] < 10:
+        return "unknown"
+    line = ink[lines[0][0]:lines[0][1]]
+    columns = line[:, line.any(axis=0)]
+    if columns.shape[1] < 3 * (lines[0][1] - lines[0][0]):
+        return "unknown"  # Too few glyphs to judge
+    # Strokes crossed per column = ink runs starting in it
+    runs = columns[0].astype(np.int32) + (columns[1:] & ~columns[:-1]).sum(axis=0)
+    return "cjk" if runs.mean() >= 2.6 else "latin"
+
+def sort_regions_reading_order(rects, rtl=False):
+    """Order (x, y, width, height) boxes row by row, right-to-left within a row when rtl.
+
+    A box joins the current row when it overlaps the row vertically by at
+    least half the height of the shorter box.
+    """
+    rows = []
+    for rect in sorted(rects, key=lambda r: r[1]):
+        if rows and rows[-1]["bottom"] - rect[1] >= min(rows[-1]["min_height"], rect[3]) / 2:
+            row = rows[-1]
+            row["rects"].append(rect)
+            row["bottom"] = max(row["bottom"], rect[1] + rect[3])
+            row["min_height"] = min(row["min_height"], rect[3])
+        else:
+            rows.append({"rects": [rect], "bottom": rect[1] + rect[3], "min_height": rect[3]})
+    ordered = []
+    for row in rows:
+        ordered.extend(sorted(row["rects"], key=lambda r: r[0] + r[2] if rtl else r[0], reverse=rtl))
+    return ordered
+
+def merge_tile_texts(texts, min_overlap=2):
+    """Join tile results, dropping text repeated across tile overlaps"""
+    merged = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        # Longest suffix of what we have that the next tile starts with
+        longest = 0
+        for size in range(min(len(merged), len(text)), min_overlap - 1, -1):
+            if merged.endswith(text[:size]):
+                longest = size
+                break
+        merged += text[longest:]
+    return merged
+
+def load_ocr_engine(model_name, config=None):
+    """Construct the OCR engine for model_name without touching the UI"""
+    if model_name == "auto":
+        return EngineRouter(config or {})
+    config = config or {}
+    if model_name == "manga-ocr":
+        from manga_ocr import MangaOcr
+        if is_model_provisioned(config, "manga-ocr"):
+            mocr = MangaOcr(get_model_dir(config, "manga-ocr"))
+        else:
+            mocr = MangaOcr()
+        settings = get_setting_section(config, "torch_optimize")
+        if settings["enabled"]:
+            try:
+                optimize_manga_ocr(mocr, settings)
+            except Exception as e:
+                print(f"manga-ocr optimisation failed, using eager mode: {e}")
+        return mocr
+    if model_name == "easyocr":
+        # EasyOCR prints progress that breaks on non-utf-8 consoles
+        old_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+        try:
+            import easyocr
+            if is_model_provisioned(config, "easyocr"):
+                return easyocr.Reader(['en'], gpu=False, model_storage_directory=get_model_dir(config, "easyocr"),
+                                      download_enabled=False, verbose=False)
+            return easyocr.Reader(['en'], gpu=False, download_enabled=True, verbose=False)
+        finally:
+            sys.stdout.close()
+            sys.stdout = old_stdout
+    raise ValueError(f"Unknown OCR model: {model_name}")
+
+def optimize_manga_ocr(mocr, settings):
+    """Swap manga-ocr's vision encoder for a compiled or traced one, if it is still correct.
+
+    The encoder is compiled with torch.compile (inductor's FX graph cache
+    persisted under cache_dir) or traced and frozen with TorchScript (the
+    frozen module saved in cache_dir), so later startups skip compilation.
+    The first time, generation output and encoder activations are
+    compared against eager mode on a real text image, alone and in a batch
+    of two as tiling and multi-region sessions call it; any mismatch
+    restores the eager encoder. The result is recorded next to the
+    artefact under a key covering the torch version, device, mode,
+    channels_last, tolerance and a fingerprint of the weights, so later startups
+    reuse it and anything else starts over. Returns the recorded report.
+    """
+    import torch
+    from transformers.modeling_outputs import BaseModelOutput
+
+    model = mocr.model
+    eager_encoder = model.encoder
+    mode = settings["mode"]
+    cache_dir = settings["cache_dir"]
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(get_app_dir(), cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    channels_last = bool(settings["channels_last"])
+    images = load_optimize_samples(settings)
+    batch = torch.stack([manga_ocr_preprocess(mocr, img) for img in images]).to(model.device)
+    sample = batch[:1]
+
+    key = hashlib.sha1("|".join([
+        torch.__version__, model.config._name_or_path, str(model.device), mode,
+        f"channels_last={channels_last}", f"tolerance={settings['tolerance']}", model_fingerprint(model)
+    ]).encode()).hexdigest()[:16]
+    artefact_path = os.path.join(cache_dir, f"manga-ocr-encoder-{key}.pt")
+    record_path = os.path.join(cache_dir, f"manga-ocr-encoder-{key}.json")
+    for name in os.listdir(cache_dir):
+        # Left over from other weights, settings or torch versions
+        if name.startswith("manga-ocr-encoder-") and key not in name:
+            os.remove(os.path.join(cache_dir, name))
+    record = None
+    if os.path.exists(record_path):
+        with open(record_path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if not record["matches"]:
+            print(f"manga-ocr {mode} failed its check against eager for this model, using eager mode")
+            return record
+
+    def timed_generate(runs=3):
+        with torch.inference_mode():
+            model.generate(sample, max_length=300)  # Warm-up, and compilation for torch.compile
+            start = time.perf_counter()
+            for _ in range(runs):
+                model.generate(sample, max_length=300)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+            texts = []
+            hidden = []
+            for pixel_values in (sample, batch):
+                ids = model.generate(pixel_values, max_length=300)
+                texts.extend(mocr.tokenizer.decode(row, skip_special_tokens=True) for row in ids)
+                hidden.append(model.encoder(pixel_values=pixel_values).last_hidden_state.float())
+        return texts, hidden, elapsed_ms
+
+    class EncoderCore(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = eager_encoder
+
+        def forward(self, pixel_values):
+            return self.encoder(pixel_values=pixel_values, return_dict=False)[0]
+
+    class OptimizedEncoder(torch.nn.Module):
+        """Drop-in for the encoder: generate() only needs last_hidden_state from it"""
+        main_input_name = "pixel_values"
+
+        def __init__(self, core):
+            super().__init__()
+            self.core = core
+            self.config = eager_encoder.config
+
+        def forward(self, pixel_values=None, **kwargs):
+            if channels_last:
+                pixel_values = pixel_values.contiguous(memory_format=torch.channels_last)
+            return BaseModelOutput(last_hidden_state=self.core(pixel_values))
+
+    def build_core():
+        if mode == "trace":
+            if os.path.exists(artefact_path):
+                return torch.jit.load(artefact_path, map_location=model.device)
+            with torch.no_grad():
+                core = torch.jit.freeze(torch.jit.trace(EncoderCore().eval(), sample, check_trace=False))
+            torch.jit.save(core, artefact_path)
+            return core
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(cache_dir, "inductor"))
+        os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+        return torch.compile(EncoderCore().eval(), dynamic=True)
+
+    if record is not None:
+        # Already checked against eager; only make sure the cached artefact still loads and runs
+        if channels_last:
+            eager_encoder.to(memory_format=torch.channels_last)
+        try:
+            model.encoder = OptimizedEncoder(build_core())
+            with torch.inference_mode():
+                model.encoder(pixel_values=sample)
+        except Exception as e:
+            model.encoder = eager_encoder
+            print(f"Cached manga-ocr {mode} encoder failed ({e}), rebuilding and checking it again")
+            for path in (artefact_path, record_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            print(f"manga-ocr {mode}: eager {record['eager_ms']:.0f} ms, optimised {record['optimized_ms']:.0f} ms "
+                  f"per crop (checked {record['checked']})")
+            return record
+
+    eager_texts, eager_hidden, eager_ms = timed_generate()
+    if channels_last:
+        eager_encoder.to(memory_format=torch.channels_last)
+    try:
+        model.encoder = OptimizedEncoder(build_core())
+        optimized_texts, optimized_hidden, optimized_ms = timed_generate()
+        max_diff = max((new - old).abs().max().item() for new, old in zip(optimized_hidden, eager_hidden))
+        matches = optimized_texts == eager_texts and all(eager_texts) and max_diff <= float(settings["tolerance"])
+    except Exception:
+        model.encoder = eager_encoder
+        raise
+    if not matches:
+        model.encoder = eager_encoder
+        if os.path.exists(artefact_path):
+            os.remove(artefact_path)
+        print(f"manga-ocr {mode} output differs from eager (max diff {max_diff:.2e}), using eager mode")
+    else:
+        print(f"manga-ocr {mode}: eager {eager_ms:.0f} ms, optimised {optimized_ms:.0f} ms per crop")
+    record = {"mode": mode, "eager_ms": eager_ms, "optimized_ms": optimized_ms,
+              "max_diff": max_diff, "matches": matches, "checked": datetime.now().isoformat(timespec="seconds")}
+    with open(record_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+    return record
+
+def model_fingerprint(model):
+    """Cheap digest of a model's weights: every tensor's name, shape and sum"""
+    import torch
+
+    digest = hashlib.sha1()
+    with torch.no_grad():
+        for name, tensor in model.state_dict().items():
+            digest.update(f"{name}{tuple(tensor.shape)}{tensor.double().sum().item():.9e}".encode())
+    return digest.hexdigest()
+
+def load_optimize_samples(settings):
+    """Two real text crops for optimize_manga_ocr's check: the configured or bundled one, and a variant.
+
+    The variant (a tighter crop of the same image) gives the batch a
+    second, different input.
+    """
+    path = settings.get("sample") or ""
+    if not path:
+        spec = importlib.util.find_spec("manga_ocr")
+        if spec and spec.origin:
+            package_dir = os.path.dirname(spec.origin)
+            for candidate in (os.path.join(package_dir, "assets", "example.jpg"),
+                              os.path.join(os.path.dirname(package_dir), "assets", "example.jpg")):
+                if os.path.exists(candidate):
+                    path = candidate
+                    break
+    if not path or not os.path.exists(path):
+        raise RuntimeError("No text image for the correctness check; set torch_optimize.sample")
+    with Image.open(path) as img:
+        first = img.convert('RGB')
+    width, height = first.size
+    second = first.crop((width // 10, height // 10, width - width // 10, height - height // 10))
+    return [first, second]
+
+MODEL_MANIFEST = ".friskocr_manifest.json"
+
+def get_model_dir(config, model_name):
+    """Where provisioned files for model_name live"""
+    storage = get_setting_section(config, "models")["storage_dir"]
+    if not os.path.isabs(storage):
+        storage = os.path.join(get_app_dir(), storage)
+    return os.path.join(storage, model_name)
+
+def is_model_provisioned(config, model_name):
+    """True once a complete, verified copy has been recorded; nothing is re-hashed"""
+    return os.path.exists(os.path.join(get_model_dir(config, model_name), MODEL_MANIFEST))
+
+def read_checksum_file(path):
+    """Parse a sha256sum-style file into {relative path: hex digest}"""
+    checksums = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split(None, 1)
+                if len(parts) == 2:
+                    checksums[parts[1].lstrip('*').replace('\\', '/')] = parts[0].lower()
+    return checksums
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def copy_with_checksum(src, dest, expected=None, chunk_size=1 << 20):
+    """Copy src to dest through a .part file, resuming a partial copy; return the sha256.
+
+    The digest is computed over the bytes written, so each file is read
+    exactly once. A mismatch with expected discards the copy.
+    """
+    if os.path.exists(dest) and os.path.getsize(dest) == os.path.getsize(src):
+        sha = file_sha256(dest)  # Finished by an interrupted earlier run
+        if not expected or sha == expected:
+            return sha
+        os.remove(dest)
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    part = dest + ".part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if offset > os.path.getsize(src):
+        os.remove(part)
+        offset = 0
+
+    digest = hashlib.sha256()
+    if offset:
+        with open(part, 'rb') as existing:
+            for block in iter(lambda: existing.read(chunk_size), b''):
+                digest.update(block)
+    with open(src, 'rb') as fin, open(part, 'ab') as fout:
+        fin.seek(offset)
+        for block in iter(lambda: fin.read(chunk_size), b''):
+            digest.update(block)
+            fout.write(block)
+
+    sha = digest.hexdigest()
+    if expected and sha != expected:
+        os.remove(part)
+        raise ValueError(f"Checksum mismatch for {src}")
+    os.replace(part, dest)
+    return sha
+
+def provision_model(config, model_name, progress=None):
+    """Copy model_name's files from the configured mirror into model storage.
+
+    Files are copied concurrently and verified against the mirror's
+    SHA256SUMS when it has one. The manifest is written last, so an
+    interrupted run resumes and a finished one is never checked again.
+    """
+    models = get_setting_section(config, "models")
+    if not models["mirror_dir"]:
+        raise RuntimeError("No model mirror directory configured")
+    dest_dir = get_model_dir(config, model_name)
+    if is_model_provisioned(config, model_name):
+        return dest_dir
+    source_dir = os.path.join(models["mirror_dir"], model_name)
+    if not os.path.isdir(source_dir):
+        raise RuntimeError(f"Model mirror has no '{model_name}' directory: {source_dir}")
+
+    expected = read_checksum_file(os.path.join(source_dir, "SHA256SUMS"))
+    files = []
+    for root, _, names in os.walk(source_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), source_dir).replace(os.sep, '/')
+            if rel != "SHA256SUMS":
+                files.append(rel)
+
+    manifest = {}
+    with ThreadPoolExecutor(max_workers=max(1, int(models["copy_workers"]))) as pool:
+        futures = {
+            pool.submit(copy_with_checksum, os.path.join(source_dir, rel), os.path.join(dest_dir, rel), expected.get(rel)): rel
+            for rel in files
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            rel = futures[future]
+            manifest[rel] = {"sha256": future.result(), "size": os.path.getsize(os.path.join(dest_dir, rel))}
+            if progress:
+                progress(f"Copied {rel} ({done}/{len(files)})")
+
+    manifest_path = os.path.join(dest_dir, MODEL_MANIFEST)
+    with open(manifest_path + ".tmp", 'w') as f:
+        json.dump({"source": source_dir, "files": manifest}, f, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return dest_dir
+
+class KeyboardHotkeyBackend:
+    """Global hook from the keyboard library; sees every keystroke system-wide"""
+    name = "keyboard"
+
+    def __init__(self):
+        self.handle = None
+
+    def register(self, shortcut, callback):
+        self.unregister()
+        self.handle = keyboard.add_hotkey(shortcut, callback)
+
+    def unregister(self):
+        if self.handle is not None:
+            keyboard.remove_hotkey(self.handle)
+            self.handle = None
+
+class X11HotkeyBackend:
+    """Grabs only the configured chord on the X11 root window.
+
+    The X server delivers just that key combination to us, so no Python
+    runs for other keystrokes and no root access or /dev/input is needed.
+    Qt has no global-shortcut API, so this uses python-xlib on its own
+    display connection and thread.
+    """
+    name = "x11"
+    MODIFIERS = {"shift": "ShiftMask", "ctrl": "ControlMask", "control": "ControlMask", "alt": "Mod1Mask"}
+    # Key names as the keyboard library and the shortcut dialog spell them -> X keysym names
+    KEYSYM_NAMES = {
+        ";": "semicolon", "'": "apostrophe", "`": "grave", ",": "comma", ".": "period",
+        "/": "slash", "\\": "backslash", "-": "minus", "=": "equal",
+        "[": "bracketleft", "]": "bracketright",
+        "enter": "Return", "return": "Return", "esc": "Escape", "escape": "Escape",
+        "space": "space", "tab": "Tab", "backspace": "BackSpace",
+        "delete": "Delete", "del": "Delete", "insert": "Insert", "ins": "Insert",
+        "home": "Home", "end": "End",
+        "pgup": "Prior", "page up": "Prior", "pageup": "Prior",
+        "pgdn": "Next", "page down": "Next", "pagedown": "Next",
+        "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+        "print screen": "Print", "printscreen": "Print",
+    }
+
+    def __init__(self):
+        from Xlib import display
+        self.display = display.Display()
+        self.root = self.display.screen().root
+        self.grabs = []
+        self.thread = None
+        self.running = False
+
+    def parse_shortcut(self, shortcut):
+        from Xlib import X, XK
+        parts = [part.strip().lower() for part in shortcut.split('+')]
+        mask = 0
+        for part in parts[:-1]:
+            if part not in self.MODIFIERS:
+                raise ValueError(f"Unsupported modifier for X11 grab: {part}")
+            mask |= getattr(X, self.MODIFIERS[part])
+        key = self.KEYSYM_NAMES.get(parts[-1], parts[-1])
+        for candidate in (key, key.upper(), key.capitalize()):
+            keysym = XK.string_to_keysym(candidate)
+            if keysym:
+                return self.display.keysym_to_keycode(keysym), mask
+        raise ValueError(f"Unknown key for X11 grab: {key}")
+
+    def register(self, shortcut, callback):
+        from Xlib import X, error
+        self.unregister()
+        keycode, mask = self.parse_shortcut(shortcut)
+        # Grab errors arrive asynchronously; catch them and sync so they surface here
+        failed = error.CatchError(error.BadAccess)
+        # Also grab with CapsLock/NumLock on, or the chord stops working when they are
+        for extra in (0, X.LockMask, X.Mod2Mask, X.LockMask | X.Mod2Mask):
+            self.root.grab_key(keycode, mask | extra, True, X.GrabModeAsync, X.GrabModeAsync, onerror=failed)
+            self.grabs.append((keycode, mask | extra))
+        self.display.sync()
+        if failed.get_error():
+            self.unregister()
+            raise RuntimeError(f"{format_shortcut_display(shortcut)} is already taken by another application")
+        self.running = True
+        self.thread = threading.Thread(target=self._listen, args=(keycode, callback), name="x11-hotkey", daemon=True)
+        self.thread.start()
+
+    def _listen(self, keycode, callback):
+        import select
+        from Xlib import X
+        while self.running:
+            readable, _, _ = select.select([self.display.fileno()], [], [], 0.2)
+            if not readable and not self.display.pending_events():
+                continue
+            while self.running and self.display.pending_events():
+                event = self.display.next_event()
+                if event.type == X.KeyPress and event.detail == keycode:
+                    callback()
+
+    def unregister(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(1)
+            self.thread = None
+        for keycode, mask in self.grabs:
+            self.root.ungrab_key(keycode, mask)
+        self.grabs = []
+        self.display.flush()
+
+def create_hotkey_backend(name="auto"):
+    """Pick the hotkey backend; 'auto' prefers an X11 grab over the global hook.
+
+    Wayland sessions also set DISPLAY for XWayland, but a root-window grab
+    there only fires while an X11 client has focus, so 'auto' skips it.
+    """
+    if name == "keyboard":
+        return KeyboardHotkeyBackend()
+    wayland = os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland" or os.environ.get("WAYLAND_DISPLAY")
+    if name == "x11" or (
+        name == "auto"
+        and sys.platform.startswith('linux')
+        and os.environ.get("DISPLAY")
+        and not wayland
+        and importlib.util.find_spec("Xlib")
+    ):
+        try:
+            return X11HotkeyBackend()
+        except Exception as e:
+            if name == "x11":
+                raise
+            print(f"X11 hotkey backend unavailable, using keyboard hook: {e}")
+    return KeyboardHotkeyBackend()
+
+def inject_test_keystroke():
+    """Press and release a lone Shift key, which no hotkey or window acts on"""
+    try:
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+    except ImportError:
+        keyboard.send("shift")
+        return
+    if not hasattr(inject_test_keystroke, "display"):
+        inject_test_keystroke.display = display.Display()
+    d = inject_test_keystroke.display
+    keycode = d.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+    xtest.fake_input(d, X.KeyPress, keycode)
+    xtest.fake_input(d, X.KeyRelease, keycode)
+    d.sync()
+
+def benchmark_hotkey_backends(backends, keystrokes=2000, shortcut="ctrl+alt+f12", settle_s=0.5):
+    """CPU time this process spends per unrelated keystroke with each backend active.
+
+    The cost of injecting the keystrokes is measured with no backend
+    registered and subtracted. process_time() counts every thread, so
+    the hook or grab thread's work is included.
+    """
+    def measure():
+        start = time.process_time()
+        for _ in range(keystrokes):
+            inject_test_keystroke()
+        time.sleep(settle_s)  # Let the hook thread drain its queue
+        return time.process_time() - start
+
+    baseline = measure()
+    results = {}
+    for name in backends:
+        backend = create_hotkey_backend(name)
+        backend.register(shortcut, lambda: None)
+        time.sleep(settle_s)
+        try:
+            cpu = measure()
+        finally:
+            backend.unregister()
+        results[name] = round(max(0.0, cpu - baseline) / keystrokes * 1e6, 2)  # µs per keystroke
+    return results
+
+def get_process_rss():
+    """Return the resident memory of this process in bytes (0 if unknown)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        if sys.platform.startswith('win'):
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        "PeakWorkingSetSize", "WorkingSetSize",
+                        "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                        "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                        "PagefileUsage", "PeakPagefileUsage")
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        import resource
+        # Peak rather than current, but the best macOS offers without psutil
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return 0
+
+class TimingStats:
+    """Last, rolling and lifetime latency for one named operation"""
+
+    def __init__(self, window=50):
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        self.recent.append(elapsed_ms)
+
+    @property
+    def rolling_ms(self):
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "last_ms": round(self.last_ms, 2),
+            "rolling_ms": round(self.rolling_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+        }
+
+class MetricsRegistry:
+    """Process-wide timings, counters and gauges.
+
+    Recording is a dict lookup plus an append. Gauges are callbacks that
+    only run from snapshot(), i.e. while the Performance view is open.
+    """
+
+    def __init__(self):
+        self.timings = defaultdict(TimingStats)
+        self.counters = defaultdict(int)
+        self.gauges = {}
+
+    def record(self, name, elapsed_ms):
+        self.timings[name].add(elapsed_ms)
+
+    def increment(self, name, amount=1):
+        self.counters[name] += amount
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        gauges = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+        return {
+            "timings": {name: stats.as_dict() for name, stats in list(self.timings.items())},
+            "counters": dict(self.counters),
+            "gauges": gauges,
+        }
+
+METRICS = MetricsRegistry()
+
+class SamplingProfiler:
+    """Samples the Python stacks of every thread from a background thread.
+
+    Nothing is hooked or traced: while stopped there is no sampler thread
+    at all. Identical (thread, stack) samples are counted together, keyed
+    by function rather than line so flamegraphs merge cleanly.
+    """
+
+    def __init__(self, interval_ms=5):
+        self.interval = max(1, interval_ms) / 1000
+        self.samples = defaultdict(int)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        if self.thread:
+            return
+        self.samples.clear()
+        self.stop_event.clear()
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(names.get(ident, str(ident)), tuple(stack))] += 1
+
+    def write_collapsed(self, path):
+        """One 'thread;outer;...;inner count' line per stack, as flamegraph.pl expects"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for (thread_name, stack), count in sorted(self.samples.items()):
+                f.write(";".join((thread_name,) + stack) + f" {count}\n")
+
+    def write_speedscope(self, path):
+        """Speedscope sampled profile, one profile per thread"""
+        frames = {}
+        profiles = {}
+        interval_ms = self.interval * 1000
+        for (thread_name, stack), count in self.samples.items():
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled", "name": thread_name, "unit": "milliseconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+            })
+            profile["samples"].append([frames.setdefault(name, len(frames)) for name in stack])
+            profile["weights"].append(count * interval_ms)
+            profile["endValue"] += count * interval_ms
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "name": "FriskOCR",
+                "exporter": "FriskOCR sampling profiler",
+                "shared": {"frames": [{"name": name} for name in frames]},
+                "profiles": list(profiles.values()),
+            }, f)
+
+    def save(self, log_dir, fmt="speedscope"):
+        """Write the samples to log_dir with a timestamped name and return the path"""
+        os.makedirs(log_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if fmt == "collapsed":
+            path = os.path.join(log_dir, f"profile_{stamp}.folded")
+            self.write_collapsed(path)
+        else:
+            path = os.path.join(log_dir, f"profile_{stamp}.speedscope.json")
+            self.write_speedscope(path)
+        return path
+
+class SessionRecorder:
+    """Writes selection crops and their results to a session directory.
+
+    Each session is <dir>/session_<timestamp>/ holding one PNG per crop and
+    session.jsonl with one line per capture. Settings are stored on the
+    first capture and again only when they change. Writing happens on a
+    background thread so recording never delays the result.
+    """
+
+    def __init__(self, root):
+        root = root if os.path.isabs(root) else os.path.join(get_app_dir(), root)
+        self.path = os.path.join(root, "session_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
+        self.count = 0
+        self.last_settings = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-recorder")
+
+    def record(self, pil_image, model_name, config, text, timings):
+        self.count += 1
+        entry = {
+            "crop": f"{self.count:05d}.png",
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "model": model_name,
+            "text": text,
+            "timings": {name: round(value, 2) for name, value in timings.items() if value is not None},
+        }
+        settings = {name: get_setting_section(config, name) for name in DEFAULT_SETTINGS}
+        if settings != self.last_settings:
+            entry["settings"] = copy.deepcopy(settings)
+            self.last_settings = copy.deepcopy(settings)
+        self.executor.submit(self._write, pil_image, entry)
+
+    def _write(self, pil_image, entry):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            pil_image.save(os.path.join(self.path, entry["crop"]))
+            with open(os.path.join(self.path, "session.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Could not record capture: {e}")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+def iter_recorded_session(path):
+    """Yield (entry, settings, PIL image) for every capture of a recorded session"""
+    settings = {}
+    with open(os.path.join(path, "session.jsonl"), 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            settings = entry.get("settings", settings)
+            with Image.open(os.path.join(path, entry["crop"])) as img:
+                yield entry, settings, img.convert('RGB')
+
+def replay_sessions(paths, config, model_name=None, recorded_settings=False):
+    """Re-run recorded captures and compare latency and text with the recording.
+
+    model_name overrides the recorded engine; recorded_settings replays each
+    capture under the settings it was recorded with instead of config.
+    Engines are loaded once per model with config.
+    """
+    engines = {}
+    rows = []
+    for path in paths:
+        for entry, settings, image in iter_recorded_session(path):
+            model = model_name or entry["model"]
+            if model not in engines:
+                engines[model] = load_ocr_engine(model, config)
+            run_config = settings if recorded_settings and settings else config
+            start = time.perf_counter()
+            text = recognize_image(engines[model], model, image, run_config)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            recorded = entry.get("text") or ""
+            rows.append({
+                "session": os.path.basename(os.path.normpath(path)),
+                "crop": entry["crop"],
+                "model": model,
+                "recorded_ms": entry.get("timings", {}).get("ocr_ms"),
+                "replay_ms": round(elapsed_ms, 2),
+                "recorded_text": recorded,
+                "text": text,
+                "similarity": round(difflib.SequenceMatcher(None, recorded, text).ratio(), 3),
+            })
+    return rows
+
+def summarize_replay(rows):
+    """Latency and text-change totals for a replay run"""
+    def mean(values):
+        return round(sum(values) / len(values), 2) if values else 0.0
+
+    def p95(values):
+        values = sorted(values)
+        return round(values[min(len(values) - 1, int(len(values) * 0.95))], 2) if values else 0.0
+
+    recorded = [row["recorded_ms"] for row in rows if row["recorded_ms"] is not None]
+    replayed = [row["replay_ms"] for row in rows]
+    summary = {
+        "captures": len(rows),
+        "recorded_mean_ms": mean(recorded),
+        "recorded_p95_ms": p95(recorded),
+        "replay_mean_ms": mean(replayed),
+        "replay_p95_ms": p95(replayed),
+        "text_changed": sum(1 for row in rows if row["text"] != row["recorded_text"]),
+        "mean_similarity": mean([row["similarity"] for row in rows]),
+    }
+    if summary["recorded_mean_ms"]:
+        summary["latency_change_pct"] = round(
+            (summary["replay_mean_ms"] - summary["recorded_mean_ms"]) / summary["recorded_mean_ms"] * 100, 1
+        )
+    return summary
+
+def looks_like_single_line(pil_image):
+    """Cheap check for a tight crop holding one horizontal line of text.
+
+    Counts the bands of rows that contain ink.
+    """
+    width, height = pil_image.size
+    if width < height:
+        return False
+    return len(profile_bands(ink_mask(pil_image), axis=1)) == 1
+
+def ink_mask(pil_image):
+    """Boolean ink mask, measured against the median (background) brightness
+    so light-on-dark text works too"""
+    import numpy as np
+
+    gray = np.asarray(pil_image.convert('L'), dtype=np.int16)
+    return np.abs(gray - np.median(gray)) > 60
+
+def profile_bands(ink, axis):
+    """ink_bands of a mask's column (axis=0) or row (axis=1) profile"""
+    return ink_bands(ink.mean(axis=axis) > 0.01)
+
+def ink_bands(profile):
+    """(start, end) runs of True in a row/column ink profile, ignoring 1-pixel specks"""
+    bands = []
+    start = None
+    for index, has_ink in enumerate(list(profile) + [False]):
+        if has_ink and start is None:
+            start = index
+        elif not has_ink and start is not None:
+            if index - start >= 2:
+                bands.append((start, index))
+            start = None
+    return bands
+
+def merge_bands(bands, gap):
+    """Join (start, end) bands separated by at most gap"""
+    merged = []
+    for start, end in bands:
+        if merged and start - merged[-1][1] <= gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def easyocr_read(reader, pil_image, config):
+    """EasyOCR detections as (box, text, confidence), skipping detection when possible"""
+    import numpy as np
+
+    settings = get_setting_section(config, "easyocr")
+    options = {"batch_size": int(settings["batch_size"]), "workers": int(settings["workers"])}
+    start = time.perf_counter()
+    if settings["fast_single_line"] and looks_like_single_line(pil_image):
+        # Recognise the whole crop as one line box; no CRAFT pass
+        width, height = pil_image.size
+        result = reader.recognize(
+            np.array(pil_image.convert('L')),
+            horizontal_list=[[0, width, 0, height]],
+            free_list=[],
+            **options
+        )
+        mode = "easyocr.fast"
+    else:
+        result = reader.readtext(
+            np.array(pil_image.convert('RGB')),
+            canvas_size=int(settings["canvas_size"]),
+            **options
+        )
+        mode = "easyocr.full"
+    METRICS.record(mode, (time.perf_counter() - start) * 1000)
+    return result
+
+def weighted_confidence(detections):
+    """Mean EasyOCR confidence weighted by the length of each line"""
+    total = sum(len(text) for _, text, _ in detections)
+    if not total:
+        return 0.0
+    return sum(len(text) * conf for _, text, conf in detections) / total
+
+class EngineRouter:
+    """Automatic engine choice per crop, cheapest first.
+
+    Vertical text, which only manga-ocr reads, skips straight to it: crops
+    whose ink forms several columns, or tall crops whose ink isn't
+    horizontal lines (a single column). Everything else, narrow English
+    paragraphs included, gets an EasyOCR pass first and is only escalated
+    to manga-ocr when EasyOCR's line confidences are low.
+    """
+
+    def __init__(self, config):
+        routing = get_setting_section(config, "routing")
+        self.config = config
+        self.threshold = float(routing["confidence_threshold"])
+        self.vertical_aspect = float(routing["vertical_aspect"])
+        self.script_check = bool(routing["script_check"])
+        self.engines = {}
+        self.engine_rss = {}  # RSS growth measured while each engine loaded
+        self.route_timings = defaultdict(TimingStats)
+        self.route_confidence = defaultdict(float)  # Route -> summed cheap-pass confidence
+        self.get_engine("easyocr")
+        if routing["preload_heavy"]:
+            self.get_engine("manga-ocr")
+
+    def get_engine(self, name):
+        if name not in self.engines:
+            rss_before = get_process_rss()
+            self.engines[name] = load_ocr_engine(name, self.config)
+            self.engine_rss[name] = max(0, get_process_rss() - rss_before)
+        return self.engines[name]
+
+    def release_engine(self, name):
+        """Drop a loaded engine; get_engine loads it again when a crop next needs it"""
+        self.engines.pop(name, None)
+        self.engine_rss.pop(name, None)
+
+    def classify(self, pil_image):
+        """Cheap layout and script check: 'vertical', 'cjk' or 'horizontal'"""
+        width, height = pil_image.size
+        if looks_like_vertical_columns(pil_image):
+            return "vertical"
+        if height > width * self.vertical_aspect and not looks_like_horizontal_lines(pil_image):
+            return "vertical"
+        if self.script_check and classify_script(pil_image) == "cjk":
+            return "cjk"
+        return "horizontal"
+
+    def recognize(self, pil_image, recognize_manga):
+        """Return the text for pil_image; recognize_manga(image, engine) runs the heavy path"""
+        start = time.perf_counter()
+        confidence = 0.0
+        layout = self.classify(pil_image)
+        if layout in ("vertical", "cjk"):
+            route = f"manga-ocr ({layout})"
+            text = recognize_manga(pil_image, self.get_engine("manga-ocr"))
+        else:
+            detections = easyocr_read(self.get_engine("easyocr"), pil_image, self.config)
+            confidence = weighted_confidence(detections)
+            if confidence >= self.threshold:
+                route = "easyocr"
+                text = ' '.join(text for _, text, _ in detections)
+            else:
+                route = "manga-ocr (escalated)"
+                text = recognize_manga(pil_image, self.get_engine("manga-ocr"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.route_timings[route].add(elapsed_ms)
+        self.route_confidence[route] += confidence
+        METRICS.record(f"route {route}", elapsed_ms)
+        return text
+
+    def report(self):
+        """Per-route share, latency and mean cheap-pass confidence"""
+        total = sum(stats.count for stats in self.route_timings.values())
+        report = {}
+        for route, stats in self.route_timings.items():
+            report[route] = dict(
+                stats.as_dict(),
+                share=round(stats.count / total, 3) if total else 0.0,
+                mean_confidence=round(self.route_confidence[route] / stats.count, 3) if stats.count else 0.0,
+                crops_per_s=round(1000 / stats.rolling_ms, 2) if stats.rolling_ms else 0.0,
+            )
+        return report
+
+def recognize_manga_image(mocr, pil_image, config):
+    """Run manga-ocr, splitting long crops into columns and tiles first.
+
+    Crops of several vertical columns are cut into one crop per column
+    (read in wide_order), and each column is tiled top-to-bottom, so no
+    tile ever spans a column boundary.
+    """
+    tiling = get_setting_section(config, "tiling")
+    width, height = pil_image.size
+    max_aspect = float(tiling["max_aspect"])
+    if not tiling["enabled"] or max(width, height) <= max_aspect * min(width, height):
+        return manga_ocr_batch(mocr, [pil_image], **manga_decoding_kwargs([pil_image], config))[0]
+
+    vertical = looks_like_vertical_columns(pil_image)
+    columns = split_into_columns(pil_image, tiling["wide_order"]) if vertical else []
+    if columns:
+        groups = [split_into_tiles(column, max_aspect, float(tiling["overlap"])) for column in columns]
+    elif width > height and not vertical:
+        # A horizontal line reads best in one pass
+        return manga_ocr_batch(mocr, [pil_image], **manga_decoding_kwargs([pil_image], config))[0]
+    else:
+        groups = [split_into_tiles(pil_image, max_aspect, float(tiling["overlap"]), tiling["wide_order"])]
+
+    tiles = [tile for group in groups for tile in group]
+    batch_size = max(1, int(tiling["batch_size"]))
+    texts = []
+    for i in range(0, len(tiles), batch_size):
+        batch = tiles[i:i + batch_size]
+        texts.extend(manga_ocr_batch(mocr, batch, **manga_decoding_kwargs(batch, config)))
+    merged, start = [], 0
+    for group in groups:
+        merged.append(merge_tile_texts(texts[start:start + len(group)]))
+        start += len(group)
+    return "".join(merged)
+
+def recognize_image(engine, model_name, pil_image, config):
+    """Recognise one image with a loaded engine; the UI-free core of process_image"""
+    if isinstance(engine, WatchdogEngine):
+        return engine.recognize(pil_image)
+    if model_name == "manga-ocr":
+        return recognize_manga_image(engine, pil_image, config)
+    elif model_name == "easyocr":
+        result = easyocr_read(engine, pil_image, config)
+        return ' '.join([text for _, text, _ in result])
+    elif model_name == "auto":
+        return engine.recognize(pil_image, lambda img, mocr: recognize_manga_image(mocr, img, config))
+    return ""
+
+def recognize_batch(engine, model_name, images, config):
+    """Recognise several images, sharing one forward pass where the engine allows.
+
+    Returns a list of {"text", "boxes"} dicts in input order.
+    """
+    if isinstance(engine, WatchdogEngine):
+        return engine.recognize_batch(images)
+    if model_name == "auto":
+        return [{"text": recognize_image(engine, model_name, img, config), "boxes": []} for img in images]
+
+    if model_name == "manga-ocr":
+        tiling = get_setting_section(config, "tiling")
+        results = [None] * len(images)
+        batch = []
+        for i, img in enumerate(images):
+            width, height = img.size
+            if tiling["enabled"] and max(width, height) > float(tiling["max_aspect"]) * max(1, min(width, height)):
+                results[i] = recognize_manga_image(engine, img, config)  # Tiled on its own
+            else:
+                batch.append(i)
+        batch_images = [images[i] for i in batch]
+        texts = manga_ocr_batch(engine, batch_images, **manga_decoding_kwargs(batch_images, config)) if batch_images else []
+        for i, text in zip(batch, texts):
+            results[i] = text
+        return [
+            {"text": text, "boxes": [{"box": [[0, 0], [img.width, 0], [img.width, img.height], [0, img.height]], "text": text}]}
+            for img, text in zip(images, results)
+        ]
+
+    results = []
+    for img in images:
+        # EasyOCR has no batched path for differently sized crops
+        detections = easyocr_read(engine, img, config)
+        results.append({
+            "text": ' '.join(text for _, text, _ in detections),
+            "boxes": [
+                {"box": [[int(x), int(y)] for x, y in box], "text": text, "confidence": float(conf)}
+                for box, text, conf in detections
+            ]
+        })
+    return results
+
+def _watchdog_worker_main(conn, model_name, config):
+    """Worker process: load the engine once, then answer requests until told to stop"""
+    try:
+        engine = load_ocr_engine(model_name, config)
+    except Exception as e:
+        conn.send(("error", str(e)))
+        return
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        kind, payload = request
+        try:
+            if kind == "batch":
+                result = recognize_batch(engine, model_name, payload, config)
+            else:
+                result = recognize_image(engine, model_name, payload, config)
+            # Route stats ride along so the parent can show them without another round trip
+            conn.send(("ok", result, engine.report() if isinstance(engine, EngineRouter) else None))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+class WatchdogEngine:
+    """Runs the engine in a child process and enforces a deadline per request.
+
+    A request that overruns is abandoned: the worker is killed and a new
+    one spawned straight away, so the model reloads in the background
+    while the caller gets a TimeoutError. A worker that dies, errors or
+    overruns load_timeout_s while loading is respawned up to
+    max_load_retries times.
+    """
+
+    def __init__(self, model_name, config, timeout_s, load_timeout_s=300, max_load_retries=2):
+        self.model_name = model_name
+        self.config = config
+        self.timeout = timeout_s
+        self.load_timeout = load_timeout_s
+        self.max_load_retries = max_load_retries
+        self.timeouts = 0
+        self.restarts = 0
+        self.route_report = None  # Latest EngineRouter.report() from the worker, for "auto"
+        # spawn, not fork: the parent is a running Qt application
+        self.context = multiprocessing.get_context("spawn")
+        self._spawn()
+        self._wait_ready()
+
+    def _spawn(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_watchdog_worker_main,
+            args=(child_conn, self.model_name, self.config),
+            name=f"ocr-worker-{self.model_name}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def _wait_ready(self):
+        """Block until the worker has loaded its model, respawning it when loading fails"""
+        attempts = 0
+        while not self.ready:
+            try:
+                if self.conn.poll(self.load_timeout):
+                    status, message = self.conn.recv()
+                else:
+                    status, message = "error", f"loading took longer than {self.load_timeout:g}s"
+            except (EOFError, OSError):
+                status, message = "error", "worker exited while loading"
+            if status == "ready":
+                self.ready = True
+                break
+            # Start over with a fresh worker either way, so the next request isn't stuck on a dead one
+            self.restart()
+            if attempts >= self.max_load_retries:
+                raise RuntimeError(f"OCR worker failed to start: {message}")
+            attempts += 1
+            print(f"OCR worker failed to start ({message}), retry {attempts}/{self.max_load_retries}")
+
+    def _call(self, kind, payload):
+        self._wait_ready()
+        try:
+            self.conn.send((kind, payload))
+            if not self.conn.poll(self.timeout):
+                self.timeouts += 1
+                METRICS.increment("watchdog timeouts")
+                self.restart()
+                raise TimeoutError(f"OCR took longer than {self.timeout:g}s and was abandoned")
+            reply = self.conn.recv()
+            status, result = reply[:2]
+            if len(reply) > 2 and reply[2] is not None:
+                self.route_report = reply[2]
+        except (EOFError, BrokenPipeError):
+            self.restart()
+            raise RuntimeError("OCR worker crashed and has been restarted")
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def restart(self):
+        """Kill the current worker and start loading a fresh one"""
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+        self.restarts += 1
+        METRICS.increment("watchdog restarts")
+        print(f"OCR worker restarted (timeouts: {self.timeouts}, restarts: {self.restarts})")
+        self._spawn()
+
+    def recognize(self, pil_image):
+        return self._call("image", pil_image)
+
+    def recognize_batch(self, images):
+        return self._call("batch", images)
+
+    def close(self):
+        try:
+            self.conn.send(None)
+            self.process.join(2)
+        except (OSError, ValueError):
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+
+def create_engine(model_name, config):
+    """The engine the tray app should hold: in-process, or behind the watchdog"""
+    watchdog = get_setting_section(config, "watchdog")
+    if watchdog["enabled"]:
+        return WatchdogEngine(
+            model_name, config, float(watchdog["timeout_s"]),
+            load_timeout_s=float(watchdog["load_timeout_s"]),
+            max_load_retries=int(watchdog["max_load_retries"])
+        )
+    return load_ocr_engine(model_name, config)
+
+def pixmap_nbytes(pixmap):
+    """Approximate memory held by a QPixmap"""
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+class MemoryBudget:
+    """Per-component memory accounting with a resident-memory ceiling.
+
+    Components register a size callback and optionally a shed callback.
+    When the process RSS goes over budget, sheddable components are
+    released in priority order (lowest first) until it fits again.
+    """
+
+    def __init__(self, budget_mb=0):
+        self.budget_bytes = int(float(budget_mb) * 1024 * 1024)
+        self.components = {}
+
+    def register(self, name, size_fn, shed_fn=None, priority=0):
+        self.components[name] = (size_fn, shed_fn, priority)
+
+    def usage(self):
+        """Return {component: bytes} plus the total process RSS"""
+        report = {}
+        for name, (size_fn, _, _) in self.components.items():
+            try:
+                report[name] = int(size_fn())
+            except Exception:
+                report[name] = 0
+        report["rss"] = get_process_rss()
+        return report
+
+    def summary(self):
+        """usage() in MB on one line, for the Performance view and shedding messages"""
+        return ", ".join(f"{name} {size / (1024 * 1024):.1f}" for name, size in self.usage().items())
+
+    def enforce(self):
+        """Shed components until RSS fits the budget; return what was shed"""
+        if self.budget_bytes <= 0 or get_process_rss() <= self.budget_bytes:
+            return []
+        shed = []
+        for name, (size_fn, shed_fn, _) in sorted(self.components.items(), key=lambda item: item[1][2]):
+            if shed_fn is None or not size_fn():
+                continue
+            shed_fn()
+            shed.append(name)
+            gc.collect()
+            if get_process_rss() <= self.budget_bytes:
+                break
+        if shed:
+            print(f"Memory budget exceeded, released: {', '.join(shed)} (now {self.summary()} MB)")
+        return shed
+
+def get_app_dir():
+    """Directory main.py lives in; relative paths in the config resolve against it"""
+    return os.path.dirname(os.path.abspath(__file__))
+
+class ClipboardSink(QObject):
+    """Sets the Qt clipboard; the write is queued onto the GUI thread"""
+    name = "clipboard"
+    text_ready = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        # Created on the GUI thread, so emits from the worker arrive as queued calls
+        self.text_ready.connect(self._set_text)
+
+    def _set_text(self, text):
+        QApplication.clipboard().setText(text)
+
+    def deliver(self, text):
+        self.text_ready.emit(text)
+
+class PyperclipSink:
+    """The original clipboard path; spawns xclip/xsel on Linux"""
+    name = "pyperclip"
+
+    def deliver(self, text):
+        pyperclip.copy(text)
+
+class FileSink:
+    """Appends timestamped results to a text file"""
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path if os.path.isabs(path) else os.path.join(get_app_dir(), path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def deliver(self, text):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(f"[{datetime.now().isoformat(timespec='seconds')}] {text}\n")
+
+class StdoutSink:
+    name = "stdout"
+
+    def deliver(self, text):
+        print(text, flush=True)
+
+class SocketSink:
+    """Sends each result as one utf-8 line to a local listener"""
+    name = "socket"
+
+    def __init__(self, address):
+        self.address = address
+
+    def deliver(self, text):
+        if ':' in self.address and os.path.sep not in self.address:
+            host, port = self.address.rsplit(':', 1)
+            conn = socket.create_connection((host, int(port)), timeout=2)
+        else:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(2)
+            conn.connect(self.address)
+        with conn:
+            conn.sendall(text.encode('utf-8') + b"\n")
+
+def create_output_sinks(output):
+    """Build the sinks named in the 'output' config section"""
+    sinks = []
+    for name in output["sinks"]:
+        if name == "clipboard":
+            sinks.append(ClipboardSink())
+        elif name == "pyperclip":
+            sinks.append(PyperclipSink())
+        elif name == "file":
+            sinks.append(FileSink(output["file"]))
+        elif name == "stdout":
+            sinks.append(StdoutSink())
+        elif name == "socket":
+            sinks.append(SocketSink(output["socket"]))
+        else:
+            print(f"Unknown output sink: {name}")
+    return sinks
+
+class OutputPipeline:
+    """Delivers results to every sink on a background thread.
+
+    The queue is bounded; when a slow sink lets it fill up the oldest
+    pending result is dropped so submit() never blocks the capture loop.
+    """
+
+    def __init__(self, sinks, queue_size=64):
+        self.sinks = sinks
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="output-pipeline", daemon=True)
+        self.thread.start()
+
+    def submit(self, text):
+        while True:
+            try:
+                self.queue.put_nowait(text)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            if text is None:
+                break
+            for sink in self.sinks:
+                try:
+                    sink.deliver(text)
+                except Exception as e:
+                    print(f"Output sink '{sink.name}' failed: {e}")
+
+    def stop(self, timeout=2):
+        """Flush pending results and stop the worker"""
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+class _PendingItem:
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class MicroBatcher:
+    """Groups items submitted from many threads into batched calls.
+
+    The first item opens a window of window_ms; everything that arrives
+    before it closes (up to max_batch) is handed to process_batch together.
+    """
+
+    def __init__(self, process_batch, window_ms=20, max_batch=8):
+        self.process_batch = process_batch
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        """Queue item and block until its batch has been processed"""
+        pending = _PendingItem(item)
+        self.queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.process_batch([pending.item for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            self.batches += 1
+            self.items += len(batch)
+            for pending in batch:
+                pending.done.set()
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """POST image bytes to /ocr, get {"text": ..., "boxes": [...]} back"""
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": "not found"})
+            return
+        view = self.server.view
+        self.send_json(200, {"model": view.current_model, "loaded": bool(view.ocr)})
+
+    def do_POST(self):
+        if self.path != "/ocr":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            pil_image = Image.open(io.BytesIO(body))
+            pil_image.load()
+        except Exception as e:
+            self.send_json(400, {"error": f"could not decode image: {e}"})
+            return
+        try:
+            self.send_json(200, self.server.batcher.submit(pil_image))
+        except RuntimeError as e:
+            self.send_json(503, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+class OCRService:
+    """Localhost HTTP front end to the engine the tray app already holds"""
+
+    def __init__(self, view, service):
+        self.server = ThreadingHTTPServer((service["host"], int(service["port"])), OCRRequestHandler)
+        self.server.daemon_threads = True
+        self.server.view = view
+        self.server.batcher = MicroBatcher(
+            view.run_engine_batch,
+            window_ms=float(service["batch_window_ms"]),
+            max_batch=int(service["max_batch"])
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, name="ocr-service", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        print(f"OCR service listening on http://{host}:{port}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class SpeculativeJob:
+    """Background OCR of a selection the user may still change.
+
+    Cancelling stops in-process manga-ocr decoding at the next token, so
+    a miss releases engine_lock almost at once. EasyOCR passes and engines
+    behind the watchdog can't be interrupted: a miss there waits for the
+    stale run to finish before the real one starts.
+    """
+
+    def __init__(self, rect, pil_image, recognize):
+        self.rect = QRect(rect)
+        self.text = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._run, args=(pil_image, recognize), daemon=True)
+        self.thread.start()
+
+    def _run(self, pil_image, recognize):
+        _decode_cancel.check = lambda: self.cancelled
+        try:
+            text = recognize(pil_image)
+        except Exception as e:
+            print(f"Speculative OCR failed: {e}")
+            return
+        finally:
+            _decode_cancel.check = None
+        if not self.cancelled:
+            self.text = text
+
+    def result_for(self, rect):
+        """Wait for and return the text if this job covered exactly rect"""
+        if self.cancelled or self.rect != rect:
+            return None
+        self.thread.join()
+        return self.text
+
 class ModelInstallWorker(QThread):
     progress = pyqtSignal(str)
     finished = pyqtSignal(bool, str)
     
-    def __init__(self, model_name):
+    def __init__(self, model_name, config=None):
         super().__init__()
         self.model_name = model_name
+        self.config = config or {}
     
     def run(self):
         try:
-            # Placeholder for future development if needed
-            self.finished.emit(True, "Model check completed")
+            if not get_setting_section(self.config, "models")["mirror_dir"]:
+                # Without a mirror the engine downloads its own files on first use
+                self.finished.emit(True, "Model check completed")
+                return
+            names = ["easyocr", "manga-ocr"] if self.model_name == "auto" else [self.model_name]
+            for name in names:
+                if not is_model_provisioned(self.config, name):
+                    provision_model(self.config, name, self.progress.emit)
+            self.finished.emit(True, "Model files installed from mirror")
         except Exception as e:
             self.finished.emit(False, str(e))
 
 
 
 class BaseOCRView(QMainWindow):
+    # Emitted by run_engine/run_engine_batch from any thread; queued to touch_engine on the GUI thread
+    engine_used = pyqtSignal()
+
     def __init__(self):
         super().__init__(None, Qt.Window | Qt.WindowMinimizeButtonHint | Qt.WindowCloseButtonHint)
         self.first_hide = True
         self.setWindowTitle("Screenshot OCR")
         self.setWindowIcon(QIcon(self.get_resource_path("assets/icon.ico")))
         self.apply_theme()
-        self.config_file = "ocr_config.json"
+        self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_config.json")
+        self.config = {}
         self.load_config()
         self.ocr = None
         self.current_hotkey = None
         self.hotkey_callback = None
+        self.hotkey_backend = create_hotkey_backend(get_setting_section(self.config, "hotkey")["backend"])
         self.settings_dialog = None  # Initialize settings_dialog to None
 
         self.screenshotLabel = QLabel(self)
@@ -64,10 +1977,48 @@ class BaseOCRView(QMainWindow):
         
         self.rubberBand = QRubberBand(QRubberBand.Rectangle, self)
         self.startPoint = None
+
+        # Multi-region session: Ctrl+drag adds rectangles, Enter recognises them all
+        self.selected_regions = []
+        self.region_markers = []
         
         self.screen_geometry = None
         self.original_width = None
         self.original_height = None
+
+        # Serialises inference between the GUI thread and background jobs
+        self.engine_lock = threading.Lock()
+        self.setup_speculation()
+
+        output = get_setting_section(self.config, "output")
+        self.output_sinks = create_output_sinks(output)
+        self.output_pipeline = OutputPipeline(self.output_sinks, int(output["queue_size"]))
+
+        self.ocr_service = None
+        service = get_setting_section(self.config, "service")
+        if service["enabled"]:
+            try:
+                self.ocr_service = OCRService(self, service)
+                self.ocr_service.start()
+            except OSError as e:
+                print(f"Could not start OCR service: {e}")
+
+        METRICS.gauge("process RSS (MB)", lambda: round(get_process_rss() / (1024 * 1024), 1))
+        METRICS.gauge("engine RSS (MB)", lambda: round(self.engine_rss / (1024 * 1024), 1) if self.ocr else 0)
+        METRICS.gauge("capture buffers (MB)", lambda: round(self.capture_buffer_bytes() / (1024 * 1024), 1))
+        METRICS.gauge("output queue depth", lambda: self.output_pipeline.depth)
+        METRICS.gauge("routes", self.format_routing_report)
+        METRICS.gauge("output results dropped", lambda: self.output_pipeline.dropped)
+        if self.ocr_service:
+            METRICS.gauge("service queue depth", lambda: self.ocr_service.server.batcher.queue.qsize())
+        self.performance_dialog = None
+        self.profiler = None
+        recorder = get_setting_section(self.config, "recorder")
+        self.session_recorder = SessionRecorder(recorder["dir"]) if recorder["enabled"] else None
+
+        self.engine_rss = 0  # RSS growth measured while the model loaded
+        self.setup_memory_budget()
+        self.setup_idle_policy()
         
         self.setup_tray()
         
@@ -176,7 +2127,7 @@ class BaseOCRView(QMainWindow):
 
     def load_config(self):
         try:
-            config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_config.json")
+            config_file = self.config_file
             if os.path.exists(config_file):
                 with open(config_file, 'r') as f:
                     config = json.load(f)
@@ -185,6 +2136,7 @@ class BaseOCRView(QMainWindow):
                 with open(config_file, 'w') as f:
                     json.dump(config, f)
 
+            self.config = config
             self.shortcut = config.get("shortcut", "shift+r")
             self.current_model = config.get("model", "manga-ocr")
         except Exception as e:
@@ -195,15 +2147,148 @@ class BaseOCRView(QMainWindow):
     
     def save_config(self):
         try:
-            config = {
+            # Keep any extra sections (tiling, ...) the user has configured
+            config = dict(self.config)
+            config.update({
                 "shortcut": self.shortcut,
                 "model": self.current_model  # Ensure this saves the currently selected model
-            }
+            })
+            self.config = config
             with open(self.config_file, 'w') as f:
                 json.dump(config, f)
         except Exception as e:
             print(f"Error saving config: {e}")
 
+    def setup_memory_budget(self):
+        memory = get_setting_section(self.config, "memory")
+        self.memory_budget = MemoryBudget(memory["budget_mb"])
+        # Cheapest to lose first: capture buffers, then the auto router's manga-ocr
+        # (reloaded on its next escalation), then the whole engine
+        self.memory_budget.register("capture", self.capture_buffer_bytes, self.release_capture_buffers, priority=10)
+        self.memory_budget.register("router manga-ocr", self.router_heavy_bytes, self.release_router_heavy, priority=50)
+        self.memory_budget.register(
+            "engine",
+            lambda: self.engine_rss if self.ocr else 0,
+            self.unload_ocr if memory["shed_engine"] else None,
+            priority=100
+        )
+
+        METRICS.gauge("memory by component (MB)", self.memory_budget.summary)
+
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.memory_budget.enforce)
+        if self.memory_budget.budget_bytes > 0:
+            self.memory_timer.start(int(memory["check_interval_ms"]))
+
+    def router_heavy_bytes(self):
+        if isinstance(self.ocr, EngineRouter):
+            return self.ocr.engine_rss.get("manga-ocr", 0)
+        return 0
+
+    def release_router_heavy(self):
+        with self.engine_lock:
+            if isinstance(self.ocr, EngineRouter):
+                self.ocr.release_engine("manga-ocr")
+                self.engine_rss = sum(self.ocr.engine_rss.values())
+
+    def capture_buffer_bytes(self):
+        return pixmap_nbytes(self.pixmap) + pixmap_nbytes(self.screenshotLabel.pixmap())
+
+    def release_capture_buffers(self):
+        """Drop the full-resolution grab and the scaled copy shown in the overlay"""
+        self.pixmap = QPixmap()
+        self.screenshotLabel.clear()
+
+    def unload_ocr(self):
+        # Wait out any inference on a service or speculative thread before tearing the engine down
+        with self.engine_lock:
+            if not self.ocr:
+                return
+            if isinstance(self.ocr, WatchdogEngine):
+                self.ocr.close()
+            del self.ocr
+            self.ocr = None
+            # Remember the model was loaded so the next shortcut press reloads it
+            self.engine_unloaded = True
+        gc.collect()
+
+    def setup_idle_policy(self):
+        idle = get_setting_section(self.config, "idle")
+        self.idle_unload_ms = int(float(idle["unload_after_min"]) * 60 * 1000)
+        self.engine_unloaded = False
+        self.reload_thread = None
+        # begin_engine_reload runs on the hotkey and HTTP service threads as well as the GUI
+        self.reload_lock = threading.Lock()
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.unload_idle_engine)
+        # QTimer can only be started from the GUI thread, so service threads go through the signal
+        self.engine_used.connect(self.touch_engine)
+
+    def touch_engine(self):
+        """Restart the idle countdown after the engine was used"""
+        if self.idle_unload_ms > 0:
+            self.idle_timer.start(self.idle_unload_ms)
+
+    def unload_idle_engine(self):
+        reload_thread = self.reload_thread
+        if reload_thread and reload_thread.is_alive():
+            self.touch_engine()
+            return
+        self.wait_for_engine()
+        if self.ocr:
+            self.unload_ocr()
+            self.tray_icon.setToolTip(
+                f"OCR Tool (Shortcut: {format_shortcut_display(self.shortcut)}, model unloaded while idle)"
+            )
+
+    def begin_engine_reload(self):
+        """Reload an unloaded model in the background.
+
+        Called straight from the hotkey so loading overlaps the screen grab
+        and the rubber-band drag instead of starting at mouse release.
+        """
+        with self.reload_lock:
+            if not self.engine_unloaded or self.ocr or self.reload_thread is not None:
+                return
+            model_name = self.current_model
+            self.reload_thread = threading.Thread(target=self._reload_engine, args=(model_name,),
+                                                  name="engine-reload", daemon=True)
+            self.reload_thread.start()
+
+    def _reload_engine(self, model_name):
+        """Body of the engine-reload thread"""
+        rss_before = get_process_rss()
+        load_start = time.perf_counter()
+        try:
+            engine = create_engine(model_name, self.config)
+        except Exception as e:
+            print(f"Error reloading OCR model: {e}")
+            # Let the next request try again instead of joining this dead thread
+            with self.reload_lock:
+                if self.reload_thread is threading.current_thread():
+                    self.reload_thread = None
+            return
+        if model_name == self.current_model:
+            with self.engine_lock:
+                self.ocr = engine
+            self.engine_rss = max(0, get_process_rss() - rss_before)
+            METRICS.record("engine load", (time.perf_counter() - load_start) * 1000)
+
+    def wait_for_engine(self):
+        """Block until a background reload has finished"""
+        with self.reload_lock:
+            reload_thread = self.reload_thread
+        if reload_thread is None:
+            return
+        reload_thread.join()
+        with self.reload_lock:
+            if self.reload_thread is reload_thread:
+                self.reload_thread = None
+        if self.ocr:
+            self.engine_unloaded = False
+            self.tray_icon.setToolTip(f"OCR Tool (Shortcut: {format_shortcut_display(self.shortcut)})")
+
     def check_ocr_models(self):
     # """Check and return the first available OCR model"""
         manga_ocr_spec = importlib.util.find_spec('manga_ocr')
@@ -220,6 +2305,8 @@ class BaseOCRView(QMainWindow):
         try:
             # Clean up existing OCR instance
             if hasattr(self, 'ocr') and self.ocr:
+                if isinstance(self.ocr, WatchdogEngine):
+                    self.ocr.close()
                 del self.ocr
                 self.ocr = None
             
@@ -230,6 +2317,31 @@ class BaseOCRView(QMainWindow):
                 kernel32 = ctypes.windll.kernel32
                 kernel32.SetConsoleOutputCP(65001)
             
+            self.provision_from_mirror(loading_dialog)
+            rss_before = get_process_rss()
+            load_start = time.perf_counter()
+            if get_setting_section(self.config, "watchdog")["enabled"]:
+                try:
+                    if loading_dialog:
+                        loading_dialog.setText("Starting OCR worker process...")
+                    QApplication.processEvents()
+
+                    # The model lives in the worker, so there is no local RSS to attribute
+                    self.ocr = create_engine(self.current_model, self.config)
+                    self.engine_rss = 0
+                    METRICS.record("engine load", (time.perf_counter() - load_start) * 1000)
+                    self.engine_unloaded = False
+                    self.touch_engine()
+                    return True
+                except Exception as e:
+                    QMessageBox.critical(
+                        self,
+                        "Error",
+                        f"Error starting OCR worker: {str(e)}\n\n"
+                        "Try restarting the application."
+                    )
+                    return False
+
             if self.current_model == "manga-ocr":
                 try:
                     from manga_ocr import MangaOcr
@@ -237,7 +2349,11 @@ class BaseOCRView(QMainWindow):
                         loading_dialog.setText("Initializing Manga OCR model...")
                     QApplication.processEvents()
                     
-                    self.ocr = MangaOcr()
+                    self.ocr = load_ocr_engine("manga-ocr", self.config)
+                    self.engine_rss = max(0, get_process_rss() - rss_before)
+                    METRICS.record("engine load", (time.perf_counter() - load_start) * 1000)
+                    self.engine_unloaded = False
+                    self.touch_engine()
                     return True
                     
                 except Exception as e:
@@ -275,8 +2391,12 @@ class BaseOCRView(QMainWindow):
                     
                     # Suppress stdout during Reader initialization
                     sys.stdout = open(os.devnull, 'w', encoding='utf-8')
-                    self.ocr = easyocr.Reader(['en'], gpu=False, download_enabled=True, verbose=False)
+                    self.ocr = load_ocr_engine("easyocr", self.config)
                     sys.stdout = old_stdout
+                    self.engine_rss = max(0, get_process_rss() - rss_before)
+                    METRICS.record("engine load", (time.perf_counter() - load_start) * 1000)
+                    self.engine_unloaded = False
+                    self.touch_engine()
                     
                     return True
                     
@@ -312,6 +2432,28 @@ class BaseOCRView(QMainWindow):
                     return False
                 finally:
                     sys.stdout = old_stdout
+
+            elif self.current_model == "auto":
+                try:
+                    if loading_dialog:
+                        loading_dialog.setText("Initializing OCR engines for automatic routing...")
+                    QApplication.processEvents()
+
+                    self.ocr = load_ocr_engine("auto", self.config)
+                    self.engine_rss = max(0, get_process_rss() - rss_before)
+                    METRICS.record("engine load", (time.perf_counter() - load_start) * 1000)
+                    self.engine_unloaded = False
+                    self.touch_engine()
+                    return True
+
+                except Exception as e:
+                    QMessageBox.critical(
+                        self,
+                        "Error",
+                        f"Error initializing OCR engines: {str(e)}\n\n"
+                        "Automatic mode needs both EasyOCR and Manga OCR installed."
+                    )
+                    return False
             
             return False
         except Exception as e:
@@ -326,6 +2468,33 @@ class BaseOCRView(QMainWindow):
             if loading_dialog:
                 loading_dialog.close()
 
+    def provision_from_mirror(self, loading_dialog=None):
+        """Copy missing model files from the configured mirror before loading.
+
+        The copy runs on a ModelInstallWorker thread; a local event loop keeps
+        the UI painting and shows its progress until the worker is done.
+        """
+        if not get_setting_section(self.config, "models")["mirror_dir"]:
+            return
+        names = ["easyocr", "manga-ocr"] if self.current_model == "auto" else [self.current_model]
+        if all(is_model_provisioned(self.config, name) for name in names):
+            return
+
+        def finished(success, message):
+            if not success:
+                # Fall back to the engine's own download
+                print(f"Could not provision {self.current_model} from mirror: {message}")
+            loop.quit()
+
+        loop = QEventLoop()
+        worker = ModelInstallWorker(self.current_model, self.config)
+        if loading_dialog:
+            worker.progress.connect(loading_dialog.setText)
+        worker.finished.connect(finished)
+        worker.start()
+        loop.exec_()
+        worker.wait()
+
     def get_resource_path(self, relative_path):
     # """Get absolute path to resource, works for dev and for PyInstaller."""
         try:
@@ -358,10 +2527,14 @@ class BaseOCRView(QMainWindow):
 
         tray_menu = QMenu()
         settings_action = tray_menu.addAction("Settings")
+        performance_action = tray_menu.addAction("Performance")
+        self.profiler_action = tray_menu.addAction("Start Profiling")
         tray_menu.addSeparator()
         quit_action = tray_menu.addAction("Quit")
         
         settings_action.triggered.connect(lambda: self.show_settings(first_run=False))
+        performance_action.triggered.connect(self.show_performance)
+        self.profiler_action.triggered.connect(self.toggle_profiler)
         quit_action.triggered.connect(self.quit_app)
         
         self.tray_icon.setContextMenu(tray_menu)
@@ -373,32 +2546,45 @@ class BaseOCRView(QMainWindow):
         try:
             # Remove existing hotkey if it exists
             if self.hotkey_callback:
-                keyboard.remove_hotkey(self.hotkey_callback)
+                self.hotkey_backend.unregister()
                 self.hotkey_callback = None
             
             # Register new hotkey and store the callback
-            self.hotkey_callback = keyboard.add_hotkey(self.shortcut, self.trigger_screenshot_display)
+            self.hotkey_backend.register(self.shortcut, self.trigger_screenshot_display)
+            self.hotkey_callback = self.trigger_screenshot_display
             self.current_hotkey = self.shortcut
             
             # Update tray tooltip
             if hasattr(self, 'tray_icon'):
                 self.tray_icon.setToolTip(f"OCR Tool (Shortcut: {format_shortcut_display(self.shortcut)})")
         except Exception as e:
+            if isinstance(e, ValueError) and isinstance(self.hotkey_backend, X11HotkeyBackend):
+                # X11 has no keysym for this chord; the global hook may still know it,
+                # so switch backends rather than discarding the user's shortcut
+                print(f"X11 backend can't grab {self.shortcut}, using keyboard hook: {e}")
+                self.hotkey_backend = KeyboardHotkeyBackend()
+                self.start_hotkey_listener()
+                return
             QMessageBox.warning(
                 self,
                 "Hotkey Error",
                 f"Error setting shortcut: {str(e)}\nPlease try a different shortcut."
             )
-            # Revert to default if there's an error
-            self.shortcut = "shift+r"
-            self.save_config()
-            self.start_hotkey_listener()
+            # Revert to default if there's an error; if even that is taken from the
+            # X server, fall back to the global hook, which doesn't need an exclusive grab
+            if self.shortcut != "shift+r":
+                self.shortcut = "shift+r"
+                self.save_config()
+                self.start_hotkey_listener()
+            elif isinstance(self.hotkey_backend, X11HotkeyBackend):
+                self.hotkey_backend = KeyboardHotkeyBackend()
+                self.start_hotkey_listener()
 
     def restart_hotkey_listener(self):
         try:
             # Remove existing hotkey
             if self.hotkey_callback:
-                keyboard.remove_hotkey(self.hotkey_callback)
+                self.hotkey_backend.unregister()
                 self.hotkey_callback = None
             
             # Add a small delay before registering the new hotkey
@@ -477,25 +2663,85 @@ class BaseOCRView(QMainWindow):
 
     def process_image(self, pil_image):
         try:
-            if not self.ocr or self.current_model not in ["manga-ocr", "easyocr"]:
+            self.wait_for_engine()
+            self.touch_engine()
+            if not self.ocr or self.current_model not in ["manga-ocr", "easyocr", "auto"]:
                 if not self.initialize_ocr():
                     QMessageBox.warning(self, "No OCR Model", "Please install an OCR model first.")
                     return ""
 
-            if self.current_model == "manga-ocr":
-                return self.ocr(pil_image)
-            elif self.current_model == "easyocr":
-                import numpy as np
-                # Convert image to RGB before processing
-                numpy_image = np.array(pil_image.convert('RGB'))
-                result = self.ocr.readtext(numpy_image)
-                return ' '.join([text for _, text, _ in result])
+            return self.run_engine(pil_image)
         except Exception as e:
             QMessageBox.critical(self, "OCR Error", f"Error processing image: {str(e)}")
             return ""
 
-    def trigger_screenshot_display(self):
+    def run_engine(self, pil_image):
+        """Recognise pil_image with the loaded engine; safe to call from any thread"""
+        with self.engine_lock:
+            start = time.perf_counter()
+            text = recognize_image(self.ocr, self.current_model, pil_image, self.config)
+            METRICS.record("ocr", (time.perf_counter() - start) * 1000)
+        self.engine_used.emit()
+        return text
+
+    def run_engine_batch(self, images):
+        """Recognise several images, sharing one forward pass where the engine allows.
+
+        Returns a list of {"text", "boxes"} dicts in input order.
+        """
+        if not self.ocr:
+            # Unloaded while idle: reload without touching the UI from this thread
+            self.begin_engine_reload()
+            with self.reload_lock:
+                reload_thread = self.reload_thread
+            if reload_thread is not None:
+                reload_thread.join()
         if not self.ocr:
+            raise RuntimeError("No OCR model is loaded")
+
+        with self.engine_lock:
+            results = recognize_batch(self.ocr, self.current_model, images, self.config)
+        self.engine_used.emit()
+        return results
+
+    def setup_speculation(self):
+        speculative = get_setting_section(self.config, "speculative")
+        self.speculative_enabled = bool(speculative["enabled"])
+        self.speculative_min_size = int(speculative["min_size"])
+        self.speculation = None
+        self.speculation_timer = QTimer(self)
+        self.speculation_timer.setSingleShot(True)
+        self.speculation_timer.setInterval(int(speculative["dwell_ms"]))
+        self.speculation_timer.timeout.connect(self.start_speculation)
+
+    def start_speculation(self):
+        """OCR the current rubber band once it has been still for the dwell time"""
+        if not self.startPoint or not self.rubberBand.isVisible() or not self.ocr:
+            return
+        rect = self.selection_device_rect()
+        if min(rect.width(), rect.height()) < self.speculative_min_size:
+            return
+        if self.speculation and not self.speculation.cancelled:
+            return  # Already working on this rectangle
+        if self.speculation and self.speculation.thread.is_alive():
+            # The engine is still busy with a stale rectangle, check again later
+            self.speculation_timer.start()
+            return
+        self.speculation = SpeculativeJob(rect, self.crop_selection(rect), self.run_engine)
+
+    def cancel_speculation(self):
+        self.speculation_timer.stop()
+        if self.speculation:
+            self.speculation.cancelled = True
+
+    def recognize_manga(self, pil_image, mocr=None):
+        """Run manga-ocr, tiling long vertical columns and page strips first"""
+        return recognize_manga_image(mocr or self.ocr, pil_image, self.config)
+
+    def trigger_screenshot_display(self):
+        if self.engine_unloaded:
+            self.begin_engine_reload()
+        elif not self.ocr:
             QMessageBox.warning(
                 self,
                 "No OCR Model",
@@ -505,9 +2751,17 @@ class BaseOCRView(QMainWindow):
         QTimer.singleShot(0, self.capture_and_display_screenshot)
 
     def capture_and_display_screenshot(self):
-        screen = QApplication.primaryScreen()
+        if self.engine_unloaded:
+            # Let an abandoned selection unload the reloaded model again
+            self.touch_engine()
+        # Only grab the screen the user is looking at, not the whole desktop
+        screen = QApplication.screenAt(QCursor.pos()) or QApplication.primaryScreen()
         self.screen_geometry = screen.geometry()
+        start = time.perf_counter()
+        # Coordinates passed with window 0 are relative to this screen (Qt adds its origin),
+        # so the whole-screen default is the right grab on every monitor
         self.pixmap = screen.grabWindow(0)
+        METRICS.record(f"capture ({screen.name()})", (time.perf_counter() - start) * 1000)
         
         # Store the original screen dimensions
         self.original_width = self.screen_geometry.width()
@@ -520,11 +2774,17 @@ class BaseOCRView(QMainWindow):
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation
         )
+        # The grab carries the screen's device pixel ratio; the scaled copy is in logical pixels
+        scaled_pixmap.setDevicePixelRatio(1.0)
         
         self.screenshotLabel.setPixmap(scaled_pixmap)
         self.screenshotLabel.setGeometry(0, 0, self.screen_geometry.width(), self.screen_geometry.height())
         self.setWindowFlag(Qt.WindowStaysOnTopHint)
         QApplication.setOverrideCursor(Qt.CrossCursor)
+        # Put the overlay on the captured screen before going full screen
+        self.setGeometry(self.screen_geometry)
+        if self.windowHandle():
+            self.windowHandle().setScreen(screen)
         self.showFullScreen()
 
     def mousePressEvent(self, event):
@@ -536,56 +2796,169 @@ class BaseOCRView(QMainWindow):
     def mouseMoveEvent(self, event):
         if self.startPoint and event.buttons() & Qt.LeftButton:
             self.rubberBand.setGeometry(QRect(self.startPoint, event.pos()).normalized())
+            if self.speculative_enabled:
+                # Any movement invalidates a running guess and restarts the dwell
+                if self.speculation and self.speculation.rect != self.selection_device_rect():
+                    self.speculation.cancelled = True
+                self.speculation_timer.start()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton and self.startPoint:
+            if self.selected_regions or event.modifiers() & Qt.ControlModifier:
+                self.add_selection_region()
+                self.startPoint = None
+                return
             self.finalize_selection()
             QApplication.restoreOverrideCursor()
             self.hide()
             self.startPoint = None
+            self.release_capture_buffers()
+            self.memory_budget.enforce()
+
+    def selection_device_rect(self):
+        """Map the rubber band from widget coordinates to pixels of the grab"""
+        rect = self.rubberBand.geometry()
+        
+        # Calculate the scaling factors
+        scale_x = self.pixmap.width() / self.screen_geometry.width()
+        scale_y = self.pixmap.height() / self.screen_geometry.height()
+        
+        # Apply scaling to get the actual coordinates in the original image
+        return QRect(
+            int(rect.x() * scale_x),
+            int(rect.y() * scale_y),
+            int(rect.width() * scale_x),
+            int(rect.height() * scale_y)
+        ).intersected(self.pixmap.rect())
+
+    def crop_selection(self, scaled_rect):
+        """Copy scaled_rect out of the grab as a PIL image"""
+        cropped_pixmap = self.pixmap.copy(scaled_rect)
+        image = cropped_pixmap.toImage()
+        
+        buffer = image.bits().asstring(image.sizeInBytes())
+        return Image.frombytes(
+            "RGBA", 
+            (image.width(), image.height()), 
+            buffer
+        )
 
     def finalize_selection(self):
         if self.rubberBand.isVisible():
-            rect = self.rubberBand.geometry()
+            release_start = time.perf_counter()
+            scaled_rect = self.selection_device_rect()
+            pil_image = self.crop_selection(scaled_rect)
+            crop_ms = (time.perf_counter() - release_start) * 1000
+            METRICS.record("crop", crop_ms)
             
-            # Calculate the scaling factors
-            scale_x = self.pixmap.width() / self.screen_geometry.width()
-            scale_y = self.pixmap.height() / self.screen_geometry.height()
-            
-            # Apply scaling to get the actual coordinates in the original image
-            scaled_rect = QRect(
-                int(rect.x() * scale_x),
-                int(rect.y() * scale_y),
-                int(rect.width() * scale_x),
-                int(rect.height() * scale_y)
-            )
-            
-            cropped_pixmap = self.pixmap.copy(scaled_rect)
-            image = cropped_pixmap.toImage()
-            
-            buffer = image.bits().asstring(image.sizeInBytes())
-            pil_image = Image.frombytes(
-                "RGBA", 
-                (image.width(), image.height()), 
-                buffer
-            )
-            
-            ocr_result = self.process_image(pil_image)
-            if ocr_result:
-                pyperclip.copy(ocr_result)
-                self.tray_icon.showMessage(
-                    "OCR Complete",
-                    "Text has been copied to clipboard",
-                    QSystemTrayIcon.Information,
-                    2000
-                )
+            ocr_result = None
+            ocr_ms = None
+            job = self.speculation
+            self.speculation = None
+            self.speculation_timer.stop()
+            if job:
+                # Reuse the speculative result when the final selection matches it
+                ocr_result = job.result_for(scaled_rect)
+                job.cancelled = True
+                METRICS.increment("speculation hits" if ocr_result is not None else "speculation misses")
+            if ocr_result is None:
+                ocr_start = time.perf_counter()
+                ocr_result = self.process_image(pil_image)
+                ocr_ms = (time.perf_counter() - ocr_start) * 1000
+            else:
+                self.touch_engine()
+            release_ms = (time.perf_counter() - release_start) * 1000
+            METRICS.record("release to result", release_ms)
+            self.deliver_result(ocr_result)
+            if self.session_recorder:
+                self.session_recorder.record(pil_image, self.current_model, self.config, ocr_result, {
+                    "crop_ms": crop_ms,
+                    "ocr_ms": ocr_ms,
+                    "release_ms": release_ms,
+                })
             
             self.rubberBand.hide()
 
+    def deliver_result(self, ocr_result):
+        if ocr_result:
+            self.output_pipeline.submit(ocr_result)
+            copied = any(sink.name in ("clipboard", "pyperclip") for sink in self.output_sinks)
+            self.tray_icon.showMessage(
+                "OCR Complete",
+                "Text has been copied to clipboard" if copied else "Text has been sent to the configured outputs",
+                QSystemTrayIcon.Information,
+                2000
+            )
+
+    def add_selection_region(self):
+        """Keep the current rubber band as one region of a multi-region session"""
+        self.cancel_speculation()
+        rect = self.rubberBand.geometry()
+        self.rubberBand.hide()
+        if rect.width() < 2 or rect.height() < 2:
+            return
+        self.selected_regions.append(self.selection_device_rect())
+        marker = QRubberBand(QRubberBand.Rectangle, self)
+        marker.setGeometry(rect)
+        marker.show()
+        self.region_markers.append(marker)
+
+    def clear_selection_regions(self):
+        for marker in self.region_markers:
+            marker.hide()
+            marker.deleteLater()
+        self.region_markers = []
+        self.selected_regions = []
+
+    def finalize_regions(self):
+        """Recognise every region of the session in one batch, in reading order.
+
+        Regions are read right-to-left within a row for the manga models
+        (manga-ocr, or auto routing, which sends page text to it), and each
+        crop is recorded like a single selection.
+        """
+        release_start = time.perf_counter()
+        rtl = self.current_model in ("manga-ocr", "auto")
+        boxes = sort_regions_reading_order(
+            [(rect.x(), rect.y(), rect.width(), rect.height()) for rect in self.selected_regions], rtl
+        )
+        images = [self.crop_selection(QRect(*box)) for box in boxes]
+        try:
+            self.wait_for_engine()
+            self.touch_engine()
+            ocr_start = time.perf_counter()
+            results = self.run_engine_batch(images)
+            ocr_ms = (time.perf_counter() - ocr_start) * 1000
+        except Exception as e:
+            QMessageBox.critical(self, "OCR Error", f"Error processing image: {str(e)}")
+            return
+        release_ms = (time.perf_counter() - release_start) * 1000
+        METRICS.record("release to result", release_ms)
+        self.deliver_result("\n".join(result["text"] for result in results if result["text"]))
+        if self.session_recorder:
+            for image, result in zip(images, results):
+                # One shared forward pass, so each crop is charged its share of it
+                self.session_recorder.record(image, self.current_model, self.config, result["text"], {
+                    "ocr_ms": ocr_ms / len(images),
+                    "release_ms": release_ms,
+                })
+
     def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter) and self.selected_regions:
+            self.finalize_regions()
+            self.clear_selection_regions()
+            QApplication.restoreOverrideCursor()
+            self.hide()
+            self.release_capture_buffers()
+            self.memory_budget.enforce()
+            return
         if event.key() == Qt.Key_Escape:
             QApplication.restoreOverrideCursor()
             self.hide()
+            self.rubberBand.hide()
+            self.cancel_speculation()
+            self.clear_selection_regions()
+            self.release_capture_buffers()
             if self.first_hide:
                 self.tray_icon.showMessage(
                     "OCR Tool",
@@ -599,14 +2972,68 @@ class BaseOCRView(QMainWindow):
     def quit_app(self):
         try:
             if self.hotkey_callback:
-                keyboard.remove_hotkey(self.hotkey_callback)
+                self.hotkey_backend.unregister()
                 self.hotkey_callback = None
         except Exception:
             pass  # Ignore errors during cleanup
             
+        if self.profiler and self.profiler.running:
+            self.toggle_profiler()
+        self.output_pipeline.stop()
+        if self.session_recorder:
+            self.session_recorder.close()
+        if isinstance(self.ocr, WatchdogEngine):
+            self.ocr.close()
+        if self.routing_report():
+            print(f"Engine routing summary: {json.dumps(self.routing_report())}")
+        if self.ocr_service:
+            self.ocr_service.stop()
         self.tray_icon.hide()
         QApplication.quit()
         
+    def toggle_profiler(self):
+        """Start sampling all threads, or stop and dump the profile to logs/"""
+        settings = get_setting_section(self.config, "profiler")
+        if self.profiler and self.profiler.running:
+            self.profiler.stop()
+            self.profiler_action.setText("Start Profiling")
+            try:
+                path = self.profiler.save(os.path.join(get_app_dir(), "logs"), settings["format"])
+            except OSError as e:
+                QMessageBox.warning(None, "Profiler", f"Could not write the profile:\n{e}")
+                return
+            print(f"Profile of {self.profiler.elapsed:.1f}s written to {path}")
+            self.tray_icon.showMessage("Profiling stopped", f"Saved {os.path.basename(path)}",
+                                       QSystemTrayIcon.Information, 3000)
+            return
+        self.profiler = SamplingProfiler(float(settings["interval_ms"]))
+        self.profiler.start()
+        self.profiler_action.setText("Stop Profiling")
+
+    def routing_report(self):
+        """EngineRouter.report() for the auto engine, in process or behind the watchdog"""
+        if isinstance(self.ocr, EngineRouter):
+            return self.ocr.report()
+        if isinstance(self.ocr, WatchdogEngine):
+            return self.ocr.route_report
+        return None
+
+    def format_routing_report(self):
+        report = self.routing_report()
+        if not report:
+            return "n/a"
+        return "; ".join(
+            f"{route} {stats['share']:.0%} {stats['rolling_ms']:.0f}ms conf {stats['mean_confidence']:.2f}"
+            for route, stats in sorted(report.items())
+        )
+
+    def show_performance(self):
+        if self.performance_dialog is None:
+            self.performance_dialog = PerformanceDialog(self)
+        self.performance_dialog.show()
+        self.performance_dialog.raise_()
+        self.performance_dialog.activateWindow()
+
     def show_initial_settings(self):
         """Show settings dialog on startup without auto-initializing model"""
         self.settings_dialog = SettingsDialog(
@@ -617,6 +3044,65 @@ class BaseOCRView(QMainWindow):
         )
         self.settings_dialog.show()
 
+class PerformanceDialog(QDialog):
+    """Live view of the metrics registry; only polls while it is visible"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window | Qt.WindowMinimizeButtonHint | Qt.WindowCloseButtonHint)
+        self.setWindowTitle("OCR Performance")
+        self.setWindowIcon(QIcon(parent.get_resource_path("assets/icon.ico")))
+        self.resize(520, 420)
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1a1a1a;
+                color: #ffffff;
+            }
+            QLabel {
+                color: #ffffff;
+                font-family: Consolas, monospace;
+                font-size: 12px;
+            }
+        """)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        self.metrics_label = QLabel()
+        self.metrics_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.metrics_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.metrics_label)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        snapshot = METRICS.snapshot()
+        lines = [f"{'Stage':<28}{'last':>10}{'rolling':>10}{'count':>8}"]
+        for name, stats in sorted(snapshot["timings"].items()):
+            lines.append(f"{name:<28}{stats['last_ms']:>8.1f}ms{stats['rolling_ms']:>8.1f}ms{stats['count']:>8}")
+
+        counters = snapshot["counters"]
+        hits = counters.get("speculation hits", 0)
+        lookups = hits + counters.get("speculation misses", 0)
+        lines.append("")
+        lines.append(f"Speculation cache hit rate: {hits / lookups:.0%} ({hits}/{lookups})" if lookups
+                     else "Speculation cache hit rate: n/a")
+        for name, value in sorted(counters.items()):
+            if not name.startswith("speculation"):
+                lines.append(f"{name}: {value}")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"{name}: {value}")
+        self.metrics_label.setText("\n".join(lines))
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
 class LoadingOverlay(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -771,6 +3257,7 @@ class SettingsDialog(QDialog):
         self.model_combo = QComboBox()
         self.model_combo.addItem("Japanese", "manga-ocr")
         self.model_combo.addItem("English", "easyocr")
+        self.model_combo.addItem("Automatic", "auto")
         
         # Set current model
         index = self.model_combo.findData(self.current_model)
@@ -945,7 +3432,7 @@ class SettingsDialog(QDialog):
         self.progress_bar.show()
         self.progress_label.show()
         
-        self.worker = ModelInstallWorker(model_name)
+        self.worker = ModelInstallWorker(model_name, self.parent().config)
         self.worker.progress.connect(self.update_progress)
         self.worker.finished.connect(self.installation_finished)
         self.worker.start()
@@ -1043,6 +3530,695 @@ class SettingsDialog(QDialog):
         else:
             super().keyPressEvent(event)
             
+def iter_document_pages(path, dpi=200):
+    """Yield (page_number, PIL image) one page at a time.
+
+    PDFs are rasterised page by page at dpi (PyMuPDF, or pypdfium2 as a
+    fallback); multi-page TIFFs are read frame by frame. Only the current
+    page is ever held in memory.
+    """
+    if path.lower().endswith('.pdf'):
+        try:
+            import fitz
+        except ImportError:
+            fitz = None
+        if fitz:
+            doc = fitz.open(path)
+            try:
+                for index, page in enumerate(doc):
+                    pix = page.get_pixmap(dpi=dpi)
+                    yield index + 1, Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                    del pix
+            finally:
+                doc.close()
+            return
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            raise RuntimeError("PDF input needs PyMuPDF or pypdfium2: pip install pymupdf")
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    yield index + 1, page.render(scale=dpi / 72).to_pil()
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+        return
+
+    # TIFF and any other format PIL reads; single images are a one-page document
+    with Image.open(path) as img:
+        for index, frame in enumerate(ImageSequence.Iterator(img)):
+            yield index + 1, frame.convert('RGB')
+
+def ocr_document(path, engine, model_name, config, output_path, dpi=200):
+    """OCR a document page by page, appending each result to output_path as it completes.
+
+    A .jsonl output gets one {"page", "text"} object per line, anything
+    else plain text with page headers. Returns the number of pages done.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    as_jsonl = output_path.lower().endswith('.jsonl')
+    pages = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for page_number, page in iter_document_pages(path, dpi):
+            start = time.perf_counter()
+            text = recognize_image(engine, model_name, page, config)
+            del page
+            if as_jsonl:
+                out.write(json.dumps({"page": page_number, "text": text}, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"=== Page {page_number} ===\n{text}\n\n")
+            out.flush()
+            pages += 1
+            print(f"Page {page_number}: {(time.perf_counter() - start) * 1000:.0f} ms")
+    return pages
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+
+def natural_sort_key(name):
+    """Sort 'page2' before 'page10'"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+def list_archive_pages(archive):
+    """Image members of an open ZipFile in natural page order"""
+    names = [
+        info.filename for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith('__MACOSX/')
+        and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+    return sorted(names, key=natural_sort_key)
+
+def iter_archive_pages(path, start=0):
+    """Yield (index, member name, total, PIL image) from a CBZ/ZIP without extracting it.
+
+    Each member is decoded from its bytes in memory, one page at a time;
+    pages before start are skipped without being read.
+    """
+    with zipfile.ZipFile(path) as archive:
+        members = list_archive_pages(archive)
+        for index in range(start, len(members)):
+            member = members[index]
+            with Image.open(io.BytesIO(archive.read(member))) as img:
+                yield index, member, len(members), img.convert('RGB')
+
+def ocr_archive(path, engine, model_name, config, output_path, restart=False):
+    """OCR every page of a manga archive into a .jsonl file, resumably.
+
+    Progress is kept in <output>.progress.json after every page; a later
+    run picks up from the first page not yet written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    progress_path = output_path + ".progress.json"
+    done = 0
+    if not restart and os.path.exists(progress_path) and os.path.exists(output_path):
+        try:
+            with open(progress_path, 'r') as f:
+                progress = json.load(f)
+            if progress.get("archive") == os.path.abspath(path):
+                done = int(progress.get("done", 0))
+        except (OSError, ValueError):
+            done = 0
+    if done:
+        print(f"Resuming after page {done}")
+
+    with open(output_path, 'a' if done else 'w', encoding='utf-8') as out:
+        for index, member, total, page in iter_archive_pages(path, start=done):
+            start = time.perf_counter()
+            text = recognize_image(engine, model_name, page, config)
+            del page
+            out.write(json.dumps({"page": index + 1, "member": member, "text": text}, ensure_ascii=False) + "\n")
+            out.flush()
+            done = index + 1
+            with open(progress_path, 'w') as f:
+                json.dump({"archive": os.path.abspath(path), "done": done, "total": total}, f)
+            print(f"[{done}/{total}] {member}: {(time.perf_counter() - start) * 1000:.0f} ms")
+    return done
+
+def collect_image_files(paths):
+    """Expand files and directories into image paths in natural order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path), key=natural_sort_key)
+            files.extend(os.path.join(path, name) for name in names if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+def allow_large_images(config):
+    """Let PIL open pages up to large_images.max_pixels without a DecompressionBombError"""
+    max_pixels = int(get_setting_section(config, "large_images")["max_pixels"])
+    if Image.MAX_IMAGE_PIXELS is not None and max_pixels > Image.MAX_IMAGE_PIXELS:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+
+def is_large_image(path, config):
+    """True when the header says the page should go through ocr_large_image"""
+    settings = get_setting_section(config, "large_images")
+    if not settings["enabled"]:
+        return False
+    with Image.open(path) as img:  # Reads the header only
+        width, height = img.size
+    return width * height >= int(settings["min_pixels"])
+
+def reduce_to_side(view, max_side):
+    """Shrink a grayscale image with Image.reduce until its long side fits max_side"""
+    factor = -(-max(view.size) // max_side)
+    return view.reduce(factor) if factor > 1 else view
+
+def can_read_windows(img):
+    """True for TIFFs whose regions iter_image_regions can decode on their own"""
+    return img.format == 'TIFF' and (len(img.tile) > 1 or img.tile[0][0] == 'raw')
+
+def load_reduced_view(path, max_side):
+    """Grayscale copy of an image whose long side is at most max_side, and its scale.
+
+    JPEGs decode straight to 1/2-1/8 size in draft mode; other formats are
+    decoded once, converted and shrunk with Image.reduce, and the full frame
+    is dropped before returning. Scale maps view pixels to file pixels.
+    """
+    with Image.open(path) as img:
+        width = img.width
+        factor = -(-max(img.size) // max_side)
+        if img.format == 'JPEG' and factor > 1:
+            img.draft('L', (img.width // factor, img.height // factor))
+        view = img.convert('L')
+    view = reduce_to_side(view, max_side)
+    return view, width / view.width
+
+def find_text_regions(view, merge_gap=4, min_size=4):
+    """(x, y, width, height) ink blocks of a page by recursive XY-cut.
+
+    A block is split along whichever axis still has a blank gap wider than
+    merge_gap, rows first, until every piece is one band both ways.
+    """
+    ink = ink_mask(view)
+    regions = []
+    pending = [(0, 0, view.width, view.height)]
+    while pending:
+        x, y, width, height = pending.pop()
+        block = ink[y:y + height, x:x + width]
+        rows = merge_bands(profile_bands(block, axis=1), merge_gap)
+        columns = merge_bands(profile_bands(block, axis=0), merge_gap)
+        if not rows or not columns:
+            continue
+        if len(rows) > 1:
+            pending.extend((x, y + top, width, bottom - top) for top, bottom in rows)
+        elif len(columns) > 1:
+            pending.extend((x + left, y, right - left, height) for left, right in columns)
+        else:
+            (top, bottom), (left, right) = rows[0], columns[0]
+            if bottom - top >= min_size and right - left >= min_size:
+                regions.append((x + left, y + top, right - left, bottom - top))
+    return regions
+
+def load_image_strips(img, box):
+    """Decode only the strips/tiles of an unloaded image that box touches.
+
+    Works on uncompressed TIFFs, which PIL reads as raw rows (contiguous
+    strips) or one raw tile per TIFF tile, by narrowing the tile list to a
+    window. Compressed TIFFs go through libtiff as a single tile and get
+    None, as does anything whose decoded window isn't the expected size;
+    the caller then decodes the whole page.
+
+    This edits PIL's private size and tile list, so it is only used on the
+    layouts above and every result is checked.
+    """
+    if len(img.tile) == 1 and img.tile[0][0] == 'raw':
+        # One uncompressed block (PIL joins contiguous strips): window it by rows
+        name, extents, offset, args = img.tile[0]
+        if not (args[0] == img.mode and img.mode in ('L', 'RGB', 'RGBA', 'CMYK')):
+            return None
+        if len(args) > 2 and args[2] != 1:
+            return None  # Bottom-up rows
+        stride = args[1] or extents[2] * len(img.mode)
+        img._size = (extents[2], box[3] - box[1])
+        img.tile = [(name, (0, 0, extents[2], box[3] - box[1]), offset + box[1] * stride, (args[0], stride, 1))]
+        img.load()
+        crop = img.crop((box[0], 0, box[2], box[3] - box[1]))
+        return crop if crop.size == (box[2] - box[0], box[3] - box[1]) else None
+
+    tiles = [tile for tile in img.tile
+             if tile[1][0] < box[2] and tile[1][2] > box[0] and tile[1][1] < box[3] and tile[1][3] > box[1]]
+    if len(img.tile) < 2 or not tiles:
+        return None
+    left = min(tile[1][0] for tile in tiles)
+    top = min(tile[1][1] for tile in tiles)
+    right = max(tile[1][2] for tile in tiles)
+    bottom = max(tile[1][3] for tile in tiles)
+    img._size = (right - left, bottom - top)
+    img.tile = [
+        (tile[0], (tile[1][0] - left, tile[1][1] - top, tile[1][2] - left, tile[1][3] - top), tile[2], tile[3])
+        for tile in tiles
+    ]
+    img.load()
+    crop = img.crop((box[0] - left, box[1] - top, box[2] - left, box[3] - top))
+    return crop if crop.size == (box[2] - box[0], box[3] - box[1]) else None
+
+def iter_image_regions(path, boxes):
+    """Yield full-resolution RGB crops of path for each (left, top, right, bottom) box.
+
+    Tiled/striped files decode just the pieces each box needs. Anything
+    else is decoded once for all boxes, in grayscale where the codec
+    allows (JPEG), which is what the engines consume anyway.
+    """
+    with Image.open(path) as img:
+        striped = can_read_windows(img)
+    remaining = list(boxes)
+    while striped and remaining:
+        with Image.open(path) as window:
+            try:
+                crop = load_image_strips(window, remaining[0])
+            except (OSError, ValueError):
+                crop = None
+        if crop is None:
+            break
+        remaining.pop(0)
+        yield crop.convert('RGB')
+    if not remaining:
+        return
+
+    with Image.open(path) as img:
+        if img.format == 'JPEG':
+            img.draft('L', img.size)
+        page = img.convert('L')
+    for box in remaining:
+        yield page.crop(box).convert('RGB')
+
+def ocr_large_image(engine, model_name, path, config):
+    """OCR a very large page without holding it decoded at full colour.
+
+    Text regions are found on a reduced view, then each region is read at
+    full resolution and recognised, in reading order. JPEGs (draft-mode
+    view) and windowable TIFFs go back to the file per region; anything
+    else (PNG, compressed TIFF) is decoded once to grayscale and both the
+    view and the crops come from that copy.
+    """
+    settings = get_setting_section(config, "large_images")
+    max_side = int(settings["detect_max_side"])
+    with Image.open(path) as img:
+        width, height = img.size
+        page = None
+        if img.format != 'JPEG' and not can_read_windows(img):
+            page = img.convert('L')
+    if page is not None:
+        view = reduce_to_side(page, max_side)
+        scale = width / view.width
+    else:
+        view, scale = load_reduced_view(path, max_side)
+    regions = find_text_regions(view, merge_gap=max(1, round(int(settings["merge_gap"]) / scale)))
+    del view
+
+    padding = int(settings["padding"])
+    boxes = [
+        (max(0, int(x * scale) - padding), max(0, int(y * scale) - padding),
+         min(width, int((x + w) * scale) + padding), min(height, int((y + h) * scale) + padding))
+        for x, y, w, h in sort_regions_reading_order(regions, rtl=settings["order"] == "rtl")
+    ]
+    METRICS.increment("large pages")
+    METRICS.increment("large page regions", len(boxes))
+    if page is not None:
+        crops = (page.crop(box).convert('RGB') for box in boxes)
+    else:
+        crops = iter_image_regions(path, boxes)
+    texts = [recognize_image(engine, model_name, crop, config) for crop in crops]
+    return "\n".join(text for text in texts if text.strip())
+
+# Engine shared with forked pool workers; set in the parent before the fork
+_pool_state = {}
+
+def _init_pool_worker(threads, model_name=None, config=None):
+    """Pin torch threads per worker; spawn-based pools also load their own engine"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+    allow_large_images(config or _pool_state.get("config"))
+    if "engine" not in _pool_state:
+        _pool_state.update(engine=load_ocr_engine(model_name, config), model=model_name, config=config)
+
+def _pool_ocr_file(path):
+    start = time.perf_counter()
+    try:
+        if is_large_image(path, _pool_state["config"]):
+            text = ocr_large_image(_pool_state["engine"], _pool_state["model"], path, _pool_state["config"])
+        else:
+            with Image.open(path) as img:
+                text = recognize_image(_pool_state["engine"], _pool_state["model"], img.convert('RGB'), _pool_state["config"])
+        error = None
+    except Exception as e:
+        text, error = "", str(e)
+    return path, text, (time.perf_counter() - start) * 1000, error
+
+def ocr_files_in_pool(files, model_name, config, output_path, workers=None, threads_per_worker=1):
+    """OCR many image files across a process pool.
+
+    Where fork is available the model is loaded once in this process and
+    the workers inherit its weights copy-on-write; gc.freeze() keeps the
+    collector from touching (and so copying) those pages. Without fork
+    (Windows) every worker loads its own copy. Returns pages per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods:
+        context = multiprocessing.get_context("fork")
+        _pool_state.update(engine=load_ocr_engine(model_name, config), model=model_name, config=config)
+        gc.collect()
+        gc.freeze()
+        initargs = (threads_per_worker,)
+    else:
+        context = multiprocessing.get_context("spawn")
+        initargs = (threads_per_worker, model_name, config)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    start = time.perf_counter()
+    done = 0
+    with context.Pool(workers, initializer=_init_pool_worker, initargs=initargs) as pool, \
+            open(output_path, 'w', encoding='utf-8') as out:
+        for path, text, elapsed_ms, error in pool.imap(_pool_ocr_file, files, chunksize=1):
+            record = {"file": path, "text": text, "ms": round(elapsed_ms, 1)}
+            if error:
+                record["error"] = error
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            done += 1
+            if done % 10 == 0 or done == len(files):
+                print(f"[{done}/{len(files)}] {done / (time.perf_counter() - start):.2f} pages/s")
+    if "fork" in methods:
+        gc.unfreeze()
+    elapsed = time.perf_counter() - start
+    return done / elapsed if elapsed else 0.0
+
+_PIPELINE_DONE = object()
+
+class StagedPipeline:
+    """Items flow through stages on their own threads, joined by bounded queues.
+
+    stages is a list of (name, function, workers). A full queue blocks the
+    stage feeding it, so a slow stage holds back the ones before it rather
+    than letting decoded images pile up. run() yields (item, result, error)
+    in input order; report() gives each stage's busy share of the run and
+    the time it spent starved (waiting for input) or blocked (waiting for
+    room downstream).
+    """
+
+    def __init__(self, stages, queue_size=4):
+        self.stages = [(name, function, max(1, workers)) for name, function, workers in stages]
+        self.queue_size = max(1, queue_size)
+        self.stats = {}
+        self.wall = 0.0
+
+    def run(self, items):
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        lock = threading.Lock()
+        self.stats = {name: {"workers": workers, "items": 0, "busy": 0.0, "starved": 0.0, "blocked": 0.0, "running": workers}
+                      for name, _, workers in self.stages}
+
+        def put(target, entry):
+            while not stop.is_set():
+                try:
+                    target.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            for index, item in enumerate(items):
+                if not put(queues[0], (index, item, item, None)):
+                    return
+            for _ in range(self.stages[0][2]):
+                put(queues[0], _PIPELINE_DONE)
+
+        def work(position, name, function):
+            source, target = queues[position], queues[position + 1]
+            stats = self.stats[name]
+            while not stop.is_set():
+                waited = time.perf_counter()
+                try:
+                    entry = source.get(timeout=0.1)
+                except queue.Empty:
+                    with lock:
+                        stats["starved"] += time.perf_counter() - waited
+                    continue
+                starved = time.perf_counter() - waited
+                if entry is _PIPELINE_DONE:
+                    break
+                index, item, value, error = entry
+                start = time.perf_counter()
+                if error is None:
+                    try:
+                        value = function(value)
+                    except Exception as e:
+                        value, error = None, e
+                busy = time.perf_counter() - start
+                sent = time.perf_counter()
+                if not put(target, (index, item, value, error)):
+                    break
+                with lock:
+                    stats["items"] += 1
+                    stats["busy"] += busy
+                    stats["starved"] += starved
+                    stats["blocked"] += time.perf_counter() - sent
+            with lock:
+                stats["running"] -= 1
+                last = stats["running"] == 0
+            if last:
+                # The last worker out hands one end marker to each worker downstream
+                downstream = self.stages[position + 1][2] if position + 1 < len(self.stages) else 1
+                for _ in range(downstream):
+                    put(target, _PIPELINE_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for position, (name, function, workers) in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(position, name, function), name=f"pipeline-{name}-{n}", daemon=True)
+                for n in range(workers)
+            )
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            pending = {}
+            next_index = 0
+            while True:
+                entry = queues[-1].get()
+                if entry is _PIPELINE_DONE:
+                    break
+                pending[entry[0]] = entry
+                while next_index in pending:
+                    _, item, value, error = pending.pop(next_index)
+                    next_index += 1
+                    yield item, value, error
+        finally:
+            self.wall = time.perf_counter() - start
+            stop.set()
+
+    def report(self):
+        """Per-stage {"workers", "items", "utilisation", "starved_s", "blocked_s"}, in stage order"""
+        report = {}
+        for name, _, workers in self.stages:
+            stats = self.stats.get(name, {})
+            capacity = self.wall * workers
+            report[name] = {
+                "workers": workers,
+                "items": stats.get("items", 0),
+                "utilisation": round(stats.get("busy", 0.0) / capacity, 3) if capacity else 0.0,
+                "starved_s": round(stats.get("starved", 0.0), 3),
+                "blocked_s": round(stats.get("blocked", 0.0), 3),
+            }
+        return report
+
+def read_image_file(path, config=None):
+    """Read and fully decode an image file; runs on a pipeline decode thread.
+
+    Pages big enough for ocr_large_image are not decoded here: the path is
+    passed on so the inference stage reads them region by region.
+    """
+    if config is not None and is_large_image(path, config):
+        return path
+    with open(path, 'rb') as f:
+        data = f.read()
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+def ocr_files_in_pipeline(files, engine, model_name, config, output_path):
+    """OCR image files in this process, overlapping decode, conversion and inference.
+
+    Decode threads read and decode files ahead of the single inference
+    thread, which owns the engine. Very large pages skip the decode and
+    convert stages and go through ocr_large_image, as in the pool. Returns
+    (pages per second, stage report).
+    """
+    settings = get_setting_section(config, "pipeline")
+    allow_large_images(config)
+
+    def infer(page):
+        if isinstance(page, str):
+            return ocr_large_image(engine, model_name, page, config)
+        return recognize_image(engine, model_name, page, config)
+
+    pipeline = StagedPipeline([
+        ("decode", lambda path: read_image_file(path, config), int(settings["decode_threads"])),
+        ("convert", lambda page: page if isinstance(page, str) else page.convert('RGB'), 1),
+        ("infer", infer, 1),
+    ], queue_size=int(settings["queue_size"]))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    done = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for path, text, error in pipeline.run(files):
+            record = {"file": path, "text": text or ""}
+            if error:
+                record["error"] = str(error)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            done += 1
+            if done % 10 == 0 or done == len(files):
+                print(f"[{done}/{len(files)}] {done / pipeline.wall if pipeline.wall else 0:.2f} pages/s")
+    report = pipeline.report()
+    for name, stage in report.items():
+        METRICS.gauge(f"pipeline {name} utilisation", lambda value=stage["utilisation"]: value)
+    return (done / pipeline.wall if pipeline.wall else 0.0), report
+
+# Fonts with Japanese glyphs, tried in order; the first one found is used
+BENCHMARK_FONTS = (
+    "msgothic.ttc", "meiryo.ttc", "YuGothM.ttc",                      # Windows
+    "NotoSansCJK-Regular.ttc", "NotoSansCJKjp-Regular.otf",           # Linux
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "ヒラギノ角ゴシック W3.ttc", "/System/Library/Fonts/Hiragino Sans GB.ttc",  # macOS
+)
+
+def load_benchmark_font(size):
+    """(font, has Japanese glyphs): a CJK system font, else PIL's scalable default"""
+    for name in BENCHMARK_FONTS:
+        try:
+            return ImageFont.truetype(name, size), True
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size), False
+    except TypeError:  # Pillow < 10.1 has only the tiny bitmap font
+        return ImageFont.load_default(), False
+
+def make_synthetic_crop(width, height, vertical=False, text="ABC abc 123 あいう"):
+    """Black-on-white text crop for benchmarking; vertical stacks one glyph per line.
+
+    Text is rendered large with a real font, trimmed to its ink and fitted
+    into the target size. Without a Japanese font the kana are left out
+    rather than drawn as empty boxes.
+    """
+    font, has_cjk = load_benchmark_font(48)
+    if not has_cjk:
+        text = "".join(ch for ch in text if ord(ch) < 0x3000).strip()
+    label = "\n".join(ch for ch in text if ch != " ") if vertical else text
+    canvas = Image.new('L', (64 * (len(text) + 2), 64 * (len(text) + 2)), 255)
+    ImageDraw.Draw(canvas).multiline_text((16, 16), label, font=font, fill=0, spacing=4)
+    bbox = ImageOps.invert(canvas).getbbox() or (0, 0, 8, 8)
+    glyphs = canvas.crop((max(0, bbox[0] - 8), max(0, bbox[1] - 8), bbox[2] + 8, bbox[3] + 8))
+    # Fit without distorting the glyphs, centred on a white crop of the requested size
+    scale = min(width / glyphs.width, height / glyphs.height)
+    glyphs = glyphs.resize((max(1, int(glyphs.width * scale)), max(1, int(glyphs.height * scale))))
+    crop = Image.new('L', (width, height), 255)
+    crop.paste(glyphs, ((width - glyphs.width) // 2, (height - glyphs.height) // 2))
+    return crop.convert('RGB')
+
+def benchmark_images(samples_dir=None, sizes=(32, 64, 128)):
+    """Yield (label, image): synthetic horizontal/vertical/square crops plus any sample files"""
+    for size in sizes:
+        yield f"horizontal-{size}", make_synthetic_crop(size * 6, size)
+        yield f"vertical-{size}", make_synthetic_crop(size, size * 6, vertical=True)
+        yield f"square-{size * 2}", make_synthetic_crop(size * 2, size * 2)
+    if samples_dir:
+        for path in collect_image_files([samples_dir]):
+            with Image.open(path) as img:
+                yield f"sample-{os.path.basename(path)}", img.convert('RGB')
+
+def set_torch_threads(threads):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def benchmark_engines(models, config, batch_sizes=(1, 4), thread_counts=(1, 4), runs=3, samples_dir=None):
+    """Time every engine over the image set for each batch size and thread count.
+
+    Engines are loaded through load_ocr_engine, as in the tray app. Returns
+    one row per combination with latency, throughput and peak RSS.
+    """
+    images = list(benchmark_images(samples_dir))
+    rows = []
+    for model_name in models:
+        load_start = time.perf_counter()
+        engine = load_ocr_engine(model_name, config)
+        load_ms = (time.perf_counter() - load_start) * 1000
+        for threads in thread_counts:
+            set_torch_threads(threads)
+            for batch_size in batch_sizes:
+                run_config = copy.deepcopy(config)
+                run_config.setdefault("easyocr", {})["batch_size"] = batch_size
+                for label, image in images:
+                    batch = [image] * batch_size
+                    recognize_batch(engine, model_name, batch, run_config)  # Warm-up
+                    timings = []
+                    peak_rss = get_process_rss()
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        recognize_batch(engine, model_name, batch, run_config)
+                        timings.append((time.perf_counter() - start) * 1000)
+                        peak_rss = max(peak_rss, get_process_rss())
+                    timings.sort()
+                    mean_ms = sum(timings) / len(timings)
+                    rows.append({
+                        "engine": model_name,
+                        "image": label,
+                        "width": image.width,
+                        "height": image.height,
+                        "batch_size": batch_size,
+                        "threads": threads,
+                        "mean_ms": round(mean_ms, 2),
+                        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                        "images_per_s": round(batch_size * 1000 / mean_ms, 2) if mean_ms else 0.0,
+                        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+                        "load_ms": round(load_ms, 1),
+                    })
+                    print(f"{model_name} {label} batch={batch_size} threads={threads}: {mean_ms:.1f} ms")
+        del engine
+        gc.collect()
+    return rows
+
+def benchmark_key(row):
+    return f"{row['engine']}|{row['image']}|b{row['batch_size']}|t{row['threads']}"
+
+def compare_with_baseline(rows, baseline_rows):
+    """Mean latency change per combination against a stored run, in percent"""
+    baseline = {benchmark_key(row): row for row in baseline_rows}
+    comparison = []
+    for row in rows:
+        old = baseline.get(benchmark_key(row))
+        if old and old["mean_ms"]:
+            change = (row["mean_ms"] - old["mean_ms"]) / old["mean_ms"] * 100
+            comparison.append({"key": benchmark_key(row), "baseline_ms": old["mean_ms"],
+                               "mean_ms": row["mean_ms"], "change_pct": round(change, 1)})
+    return comparison
+
+def write_benchmark_results(rows, output_dir, comparison=None):
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "benchmark.json"), 'w', encoding='utf-8') as f:
+        json.dump({"rows": rows, "baseline_comparison": comparison or []}, f, indent=1)
+    if rows:
+        with open(os.path.join(output_dir, "benchmark.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
 def main():
     app = QApplication.instance()
     if not app:
@@ -1080,13 +4256,138 @@ def main():
     except SystemExit:
         try:
             if window.hotkey_callback:
-                keyboard.remove_hotkey(window.hotkey_callback)
+                window.hotkey_backend.unregister()
         except Exception:
             pass
         if hasattr(window, 'tray_icon'):
             window.tray_icon.hide()
 
+def run_cli(argv):
+    """Headless entry points; running main.py without arguments starts the tray app"""
+    parser = argparse.ArgumentParser(prog="main.py", description="FriskOCR command line tools")
+    parser.add_argument("--model", choices=["manga-ocr", "easyocr", "auto"],
+                        help="OCR engine to use (defaults to the one in ocr_config.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    document = commands.add_parser("document", help="OCR a PDF or multi-page TIFF page by page")
+    document.add_argument("path")
+    document.add_argument("--dpi", type=int, default=200, help="PDF rendering resolution")
+    document.add_argument("--output", help="Result file (.txt or .jsonl), defaults to Output/<name>.txt")
+
+    archive = commands.add_parser("archive", help="OCR a CBZ/ZIP manga archive without extracting it "
+                                                  "(uses manga-ocr unless --model is given)")
+    archive.add_argument("path")
+    archive.add_argument("--output", help="Result file, defaults to Output/<name>.jsonl")
+    archive.add_argument("--restart", action="store_true", help="Ignore a saved resume index")
+
+    batch = commands.add_parser("batch", help="OCR image files or directories across a process pool")
+    batch.add_argument("paths", nargs="+")
+    batch.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    batch.add_argument("--threads-per-worker", type=int, default=1, help="torch threads per worker")
+    batch.add_argument("--output", help="Result file, defaults to Output/batch.jsonl")
+    batch.add_argument("--pipeline", action="store_true",
+                       help="One process with overlapped decode/convert/infer stages instead of a pool")
+
+    provision = commands.add_parser("provision", help="Copy model files from the configured local mirror")
+    provision.add_argument("models", nargs="*", default=["manga-ocr", "easyocr"])
+
+    benchmark = commands.add_parser("benchmark", help="Throughput/latency matrix for the installed engines")
+    benchmark.add_argument("--engines", nargs="+", help="Engines to test (default: every installed one)")
+    benchmark.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4])
+    benchmark.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    benchmark.add_argument("--runs", type=int, default=3)
+    benchmark.add_argument("--samples", help="Directory of real crops to add to the synthetic set")
+    benchmark.add_argument("--output-dir", help="Defaults to Output/benchmark")
+    benchmark.add_argument("--baseline", help="Stored benchmark.json to compare against")
+    benchmark.add_argument("--save-baseline", help="Also store this run's rows at the given path")
+
+    replay = commands.add_parser("replay", help="Re-run recorded capture sessions and report regressions")
+    replay.add_argument("sessions", nargs="+", help="Session directories written by the recorder")
+    replay.add_argument("--recorded-settings", action="store_true",
+                        help="Use each capture's recorded settings instead of ocr_config.json")
+    replay.add_argument("--output", help="Report file, defaults to Output/replay.json")
+
+    hotkeys = commands.add_parser("hotkey-benchmark", help="Per-keystroke CPU cost of each hotkey backend")
+    hotkeys.add_argument("--backends", nargs="+", default=["keyboard", "x11"])
+    hotkeys.add_argument("--keystrokes", type=int, default=2000)
+
+    args = parser.parse_args(argv)
+    config = read_config()
+    model_name = args.model or config.get("model", "manga-ocr")
+
+    if args.command == "document":
+        output = args.output or os.path.join(
+            get_app_dir(), "Output", os.path.splitext(os.path.basename(args.path))[0] + ".txt"
+        )
+        engine = load_ocr_engine(model_name, config)
+        pages = ocr_document(args.path, engine, model_name, config, output, args.dpi)
+        print(f"{pages} page(s) written to {output}")
+    elif args.command == "archive":
+        output = args.output or os.path.join(
+            get_app_dir(), "Output", os.path.splitext(os.path.basename(args.path))[0] + ".jsonl"
+        )
+        # Archives are manga, so the configured screenshot model (often easyocr) doesn't apply
+        model_name = args.model or "manga-ocr"
+        engine = load_ocr_engine(model_name, config)
+        pages = ocr_archive(args.path, engine, model_name, config, output, args.restart)
+        print(f"{pages} page(s) written to {output}")
+    elif args.command == "provision":
+        for name in args.models:
+            print(f"{name}: {provision_model(config, name, print)}")
+    elif args.command == "benchmark":
+        models = args.engines or [
+            name for name, module in (("manga-ocr", "manga_ocr"), ("easyocr", "easyocr"))
+            if importlib.util.find_spec(module)
+        ]
+        rows = benchmark_engines(models, config, args.batch_sizes, args.threads, args.runs, args.samples)
+        comparison = None
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                comparison = compare_with_baseline(rows, json.load(f)["rows"])
+            for item in comparison:
+                print(f"{item['key']}: {item['baseline_ms']} -> {item['mean_ms']} ms ({item['change_pct']:+}%)")
+        output_dir = args.output_dir or os.path.join(get_app_dir(), "Output", "benchmark")
+        write_benchmark_results(rows, output_dir, comparison)
+        if args.save_baseline:
+            with open(args.save_baseline, 'w', encoding='utf-8') as f:
+                json.dump({"rows": rows}, f, indent=1)
+        print(f"Results written to {output_dir}")
+    elif args.command == "replay":
+        rows = replay_sessions(args.sessions, config, args.model, args.recorded_settings)
+        for row in rows:
+            if row["text"] != row["recorded_text"]:
+                print(f"{row['session']}/{row['crop']} changed (similarity {row['similarity']}):")
+                for line in difflib.unified_diff(row["recorded_text"].splitlines(), row["text"].splitlines(),
+                                                 "recorded", "replay", lineterm=""):
+                    print(f"  {line}")
+        summary = summarize_replay(rows)
+        print(json.dumps(summary, indent=1))
+        output = args.output or os.path.join(get_app_dir(), "Output", "replay.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "rows": rows}, f, ensure_ascii=False, indent=1)
+        print(f"Report written to {output}")
+    elif args.command == "hotkey-benchmark":
+        for name, cost in benchmark_hotkey_backends(args.backends, args.keystrokes).items():
+            print(f"{name}: {cost} µs CPU per keystroke")
+    elif args.command == "batch":
+        output = args.output or os.path.join(get_app_dir(), "Output", "batch.jsonl")
+        files = collect_image_files(args.paths)
+        if args.pipeline:
+            rate, report = ocr_files_in_pipeline(files, load_ocr_engine(model_name, config), model_name, config, output)
+            for name, stage in report.items():
+                print(f"{name:8} x{stage['workers']}: {stage['utilisation'] * 100:5.1f}% busy, "
+                      f"starved {stage['starved_s']:.1f}s, blocked {stage['blocked_s']:.1f}s")
+            bottleneck = max(report, key=lambda name: report[name]["utilisation"])
+            print(f"Bottleneck: {bottleneck}")
+        else:
+            rate = ocr_files_in_pool(files, model_name, config, output, args.workers, args.threads_per_worker)
+        print(f"{len(files)} file(s) at {rate:.2f} pages/s written to {output}")
+    return 0
+
 if __name__ == "__main__":
     multiprocessing.freeze_support()
     
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()